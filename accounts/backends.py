@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class ClinicModelBackend(ModelBackend):
+    """
+    ModelBackend that resolves the session user together with their clinic.
+
+    The user is loaded with select_related("clinic"), so that ClinicMiddleware
+    reads request.user.clinic without a second query. Django keeps the result
+    for the rest of the request only: nothing is cached across requests, so a
+    deactivated, demoted or re-passworded user takes effect on the next request
+    in every worker.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related("clinic").get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -6,6 +6,7 @@ from django.shortcuts import get_object_or_404, redirect, render
 from accounts.permissions import role_required
 from audit.models import AuditEvent
 from audit.utils import log_event
+from clinics.pagination import KeysetPaginator
 from .forms import UserCreateForm, UserEditForm
 from .models import User
 
@@ -13,8 +14,10 @@ from .models import User
 @login_required
 @role_required("admin")
 def user_list(request):
-    users = User.objects.filter(clinic=request.clinic).order_by("username")
-    return render(request, "accounts/user_list.html", {"users": users})
+    users = User.objects.filter(clinic=request.clinic)
+    paginator = KeysetPaginator(users, 50, ordering=("username", "id"))
+    page_obj = paginator.get_page(request.GET.get("cursor"))
+    return render(request, "accounts/user_list.html", {"users": page_obj, "page_obj": page_obj})
 
 
 @login_required
@@ -1,13 +1,34 @@
+import ipaddress
+
 from django.contrib import admin
+from django.db.models import Q
+
+from clinics.admin import KeysetPaginationMixin
 from .models import AuditEvent
 
 
 @admin.register(AuditEvent)
-class AuditEventAdmin(admin.ModelAdmin):
+class AuditEventAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     list_display = ("created_at", "action", "actor", "object_type", "object_id", "patient_id", "visit_id", "clinic", "ip_address")
     list_filter = ("action", "created_at", "clinic")
-    search_fields = ("actor__username", "object_type", "object_id", "patient_id", "visit_id", "ip_address")
+    search_fields = ("=actor__username",)
+    search_help_text = "Exact username, IP address, or patient / visit / object ID."
     ordering = ("-created_at",)
+    keyset_ordering = ("-created_at", "-id")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Typed exact matches instead of icontains over every column (a full scan with a join)
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            number = int(term)
+            return queryset.filter(Q(patient_id=number) | Q(visit_id=number) | Q(object_id=number)), False
+        try:
+            ipaddress.ip_address(term)
+        except ValueError:
+            return queryset.filter(actor__username=term), False
+        return queryset.filter(ip_address=term), False
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
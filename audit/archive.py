@@ -0,0 +1,190 @@
+"""
+Retention of audit events: archive old events to compressed files, query them.
+
+archive_events() writes every event created before a cutoff to gzip-compressed
+NDJSON files, one per clinic and calendar month (UTC):
+
+    AUDIT_ARCHIVE_DIR/clinic_<id>/<YYYY-MM>.<run>.ndjson.gz
+
+and purge_events() then removes those rows from the database (by dropping
+whole monthly partitions on PostgreSQL). Each run writes new files, so
+re-running after an interrupted purge can only duplicate events, never lose
+them; iter_archived_events() skips such duplicates when reading.
+"""
+import datetime
+import gzip
+import json
+import os
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditEvent
+from .partitions import add_months, drop_partitions_before
+
+FIELDS = (
+    "id", "created_at", "clinic_id", "actor_id", "action", "object_type", "object_id",
+    "patient_id", "visit_id", "ip_address", "user_agent", "metadata", "display",
+)
+CHUNK_SIZE = 2000
+
+
+def archive_root():
+    return str(settings.AUDIT_ARCHIVE_DIR)
+
+
+def retention_cutoff(months, now=None):
+    """Start (UTC) of the oldest month kept in the database when keeping ``months`` months."""
+    now = (now or timezone.now()).astimezone(datetime.timezone.utc)
+    first = add_months(datetime.date(now.year, now.month, 1), -months)
+    return datetime.datetime(first.year, first.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def _month_key(created_at):
+    return created_at.astimezone(datetime.timezone.utc).strftime("%Y-%m")
+
+
+class _ArchiveFile:
+    """gzip NDJSON file written under a temporary name and renamed when complete."""
+
+    def __init__(self, path):
+        self.path = path
+        self.partial = path + ".partial"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.fh = gzip.open(self.partial, "wt", encoding="utf-8")
+        self.count = 0
+
+    def write(self, row):
+        self.fh.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+        self.fh.write("\n")
+        self.count += 1
+
+    def close(self):
+        self.fh.close()
+        os.replace(self.partial, self.path)
+
+    def abort(self):
+        """Discard an incomplete file instead of giving it its final name."""
+        try:
+            self.fh.close()
+        finally:
+            try:
+                os.remove(self.partial)
+            except FileNotFoundError:
+                pass
+
+
+def archive_events(before, root=None):
+    """
+    Write all events created before ``before`` to archive files. Returns
+    {(clinic_id, "YYYY-MM"): number of events}.
+    """
+    root = root or archive_root()
+    run = timezone.now().strftime("%Y%m%dT%H%M%S")
+    rows = (
+        AuditEvent.objects
+        .filter(created_at__lt=before)
+        .order_by("created_at", "id")
+        .values_list(*FIELDS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+    counts = {}
+    open_files = {}
+    current_month = None
+    try:
+        for values in rows:
+            row = dict(zip(FIELDS, values))
+            month = _month_key(row["created_at"])
+            if month != current_month:
+                # Rows come in time order: files of the previous month are complete
+                for archive in open_files.values():
+                    archive.close()
+                open_files.clear()
+                current_month = month
+            key = (row["clinic_id"], month)
+            if key not in open_files:
+                path = os.path.join(root, f"clinic_{row['clinic_id']}", f"{month}.{run}.ndjson.gz")
+                open_files[key] = _ArchiveFile(path)
+            open_files[key].write(row)
+            counts[key] = counts.get(key, 0) + 1
+    except BaseException:
+        # Never promote half-written files: the next run rewrites these months
+        for archive in open_files.values():
+            archive.abort()
+        raise
+    for archive in open_files.values():
+        archive.close()
+    return counts
+
+
+def purge_events(before):
+    """
+    Delete events created before ``before`` (archive them first). Whole
+    monthly partitions are dropped where possible; the rest is deleted one
+    month at a time to keep transactions short. Returns the number of rows
+    deleted row by row and the names of the dropped partitions.
+    """
+    dropped = drop_partitions_before(before.date())
+
+    deleted = 0
+    oldest = AuditEvent.objects.filter(created_at__lt=before).order_by("created_at").values_list(
+        "created_at", flat=True
+    ).first()
+    while oldest is not None and oldest < before:
+        start = oldest.astimezone(datetime.timezone.utc)
+        month_end = add_months(datetime.date(start.year, start.month, 1), 1)
+        end = min(before, datetime.datetime(month_end.year, month_end.month, 1, tzinfo=datetime.timezone.utc))
+        with transaction.atomic():
+            # No relations or signals point at AuditEvent: a single DELETE per month
+            count, _ = AuditEvent.objects.filter(created_at__lt=end).delete()
+        deleted += count
+        oldest = end
+    return deleted, dropped
+
+
+def _archive_files(clinic_id, start=None, end=None, root=None):
+    directory = os.path.join(root or archive_root(), f"clinic_{clinic_id}")
+    if not os.path.isdir(directory):
+        return []
+    first = _month_key(start) if start else None
+    last = _month_key(end) if end else None
+    files = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".ndjson.gz"):
+            continue
+        month = name.split(".", 1)[0]
+        if (first and month < first) or (last and month > last):
+            continue
+        files.append((month, os.path.join(directory, name)))
+    return files
+
+
+def iter_archived_events(clinic_id, start=None, end=None, root=None, **filters):
+    """
+    Yield archived events (dicts) of a clinic with start <= created_at < end
+    and fields equal to ``filters`` (e.g. patient_id=3, action="file_downloaded"),
+    oldest month first.
+    """
+    seen = set()
+    current_month = None
+    for month, path in _archive_files(clinic_id, start, end, root):
+        if month != current_month:
+            # Duplicates can only occur within the same month
+            seen.clear()
+            current_month = month
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                row = json.loads(line)
+                if row["id"] in seen:
+                    continue
+                seen.add(row["id"])
+                created_at = parse_datetime(row["created_at"])
+                if (start and created_at < start) or (end and created_at >= end):
+                    continue
+                if any(row.get(field) != value for field, value in filters.items()):
+                    continue
+                yield row
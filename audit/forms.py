@@ -0,0 +1,49 @@
+import datetime
+
+from django import forms
+from django.utils import timezone
+
+from accounts.models import User
+from .models import AuditEvent
+
+
+class AuditSearchForm(forms.Form):
+    """
+    Typed filters of the audit search (audit.views). Every filter is an exact
+    match served by one of the (clinic, <field>, created_at) indexes.
+    """
+    actor = forms.ModelChoiceField(queryset=User.objects.none(), required=False)
+    action = forms.ChoiceField(choices=[("", "Any action")] + AuditEvent.Action.choices, required=False)
+    patient_id = forms.IntegerField(min_value=1, required=False, label="Patient ID")
+    visit_id = forms.IntegerField(min_value=1, required=False, label="Visit ID")
+    ip_address = forms.GenericIPAddressField(required=False, label="IP address")
+    date_from = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    date_to = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+
+    def __init__(self, *args, clinic=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["actor"].queryset = User.objects.filter(clinic=clinic).order_by("username")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get("date_from"), cleaned_data.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError("The start date must be before the end date.")
+        return cleaned_data
+
+    def filter(self, queryset):
+        """Apply the filters to ``queryset`` (call after is_valid())."""
+        data = self.cleaned_data
+        # One (clinic, <field>, created_at) index per equality filter
+        for field in ("actor", "action", "patient_id", "visit_id", "ip_address"):
+            if data.get(field):
+                queryset = queryset.filter(**{field: data[field]})
+
+        # Whole days in the current time zone, end date included
+        if data.get("date_from"):
+            start = datetime.datetime.combine(data["date_from"], datetime.time.min)
+            queryset = queryset.filter(created_at__gte=timezone.make_aware(start))
+        if data.get("date_to"):
+            end = datetime.datetime.combine(data["date_to"] + datetime.timedelta(days=1), datetime.time.min)
+            queryset = queryset.filter(created_at__lt=timezone.make_aware(end))
+        return queryset
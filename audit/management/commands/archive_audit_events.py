@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from audit.archive import archive_events, archive_root, purge_events, retention_cutoff
+from audit.models import AuditEvent
+from audit.partitions import ensure_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Move audit events older than the retention period into compressed archive files "
+        "(AUDIT_ARCHIVE_DIR) and delete them from the database. Also creates the upcoming "
+        "monthly partitions of the audit table on PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=None,
+            help="Keep this many full months in the database. Defaults to AUDIT_RETENTION_MONTHS.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived.")
+
+    def handle(self, *args, months=None, dry_run=False, verbosity=1, **options):
+        months = settings.AUDIT_RETENTION_MONTHS if months is None else months
+        if months < 1:
+            raise CommandError("--months must be at least 1.")
+        cutoff = retention_cutoff(months)
+
+        if dry_run:
+            count = AuditEvent.objects.filter(created_at__lt=cutoff).count()
+            self.stdout.write(f"{count} audit event(s) created before {cutoff:%Y-%m-%d} would be archived.")
+            return
+
+        for name in ensure_partitions():
+            self.stdout.write(f"Created partition {name}")
+
+        counts = archive_events(cutoff)
+        for (clinic_id, month), count in sorted(counts.items()):
+            if verbosity > 1:
+                self.stdout.write(f"Clinic {clinic_id} {month}: {count} event(s)")
+        deleted, dropped = purge_events(cutoff)
+        for name in dropped:
+            self.stdout.write(f"Dropped partition {name}")
+        if deleted:
+            self.stdout.write(f"Deleted {deleted} archived row(s) outside dropped partitions.")
+
+        archived = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} audit event(s) created before {cutoff:%Y-%m-%d} to {archive_root()}."
+        ))
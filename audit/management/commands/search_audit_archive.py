@@ -0,0 +1,47 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from audit.archive import iter_archived_events
+from audit.models import AuditEvent
+from clinics.dates import parse_date_or_datetime
+
+
+class Command(BaseCommand):
+    help = "Search a clinic's archived audit events; matches are written to stdout as NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clinic", type=int, required=True, help="Id of the clinic.")
+        parser.add_argument("--patient", type=int, help="Only events about this patient id.")
+        parser.add_argument("--actor", type=int, help="Only events by this user id.")
+        parser.add_argument("--action", choices=AuditEvent.Action.values)
+        parser.add_argument("--ip", help="Only events from this IP address.")
+        parser.add_argument("--since", help="Only events at or after this date or datetime.")
+        parser.add_argument("--until", help="Only events before this date or datetime.")
+
+    def handle(self, *args, clinic, patient=None, actor=None, action=None, ip=None, since=None, until=None,
+               **options):
+        filters = {
+            "patient_id": patient,
+            "actor_id": actor,
+            "action": action,
+            "ip_address": ip,
+        }
+        filters = {field: value for field, value in filters.items() if value is not None}
+        try:
+            start = parse_date_or_datetime(since) if since else None
+        except ValueError as exc:
+            raise CommandError(f"Invalid --since: {exc}.")
+        try:
+            end = parse_date_or_datetime(until) if until else None
+        except ValueError as exc:
+            raise CommandError(f"Invalid --until: {exc}.")
+        events = iter_archived_events(clinic, start=start, end=end, **filters)
+
+        count = 0
+        for event in events:
+            sys.stdout.write(json.dumps(event, ensure_ascii=False))
+            sys.stdout.write("\n")
+            count += 1
+        self.stderr.write(f"{count} archived event(s) found.")
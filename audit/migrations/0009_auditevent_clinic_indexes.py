@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0008_alter_auditevent_action"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditevent",
+            index=models.Index(fields=["clinic", "created_at"], name="audit_audit_clinic__068482_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditevent",
+            index=models.Index(
+                fields=["clinic", "patient_id", "created_at"],
+                name="audit_audit_clinic__86e74e_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 6.0 on 2026-10-17 21:20
+
+import datetime
+
+from django.db import migrations
+
+TABLE = "audit_auditevent"
+MONTHS_AHEAD = 3
+
+
+def _month_bounds(first, months_ahead):
+    """First days of every month from ``first`` to now + months_ahead (inclusive)."""
+    today = datetime.date.today()
+    last = datetime.date(today.year + (today.month - 1 + months_ahead) // 12, (today.month - 1 + months_ahead) % 12 + 1, 1)
+    month = datetime.date(first.year, first.month, 1)
+    while month <= last:
+        yield month
+        month = datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _table_definition(cursor):
+    """Secondary index definitions and foreign keys of the audit table, to recreate them."""
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s",
+        [TABLE, f"{TABLE}_pkey"],
+    )
+    indexes = [definition for _name, definition in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [TABLE],
+    )
+    foreign_keys = cursor.fetchall()
+    return indexes, foreign_keys
+
+
+def _rebuild(cursor, partitioned):
+    """
+    Recreate the audit table (partitioned by month on created_at, or as a
+    plain table), copy the rows over and restore indexes, keys and the id
+    sequence under their original names.
+    """
+    indexes, foreign_keys = _table_definition(cursor)
+    old = f"{TABLE}_old"
+
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {old}")
+    partition_clause = " PARTITION BY RANGE (created_at)" if partitioned else ""
+    cursor.execute(
+        f"CREATE TABLE {TABLE} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS){partition_clause}"
+    )
+
+    if partitioned:
+        cursor.execute(f"SELECT min(created_at) AT TIME ZONE 'UTC' FROM {old}")
+        first = cursor.fetchone()[0] or datetime.datetime.now()
+        for month in _month_bounds(first, MONTHS_AHEAD):
+            upper = datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{month:%Y%m} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+            )
+        # Catches rows outside the monthly partitions (see audit.partitions)
+        cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+    cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {old}")
+    cursor.execute(f"SELECT coalesce(max(id), 0) FROM {old}")
+    max_id = cursor.fetchone()[0]
+    cursor.execute(f"DROP TABLE {old}")
+
+    # Partitioned tables cannot have identity columns before PostgreSQL 17: use a plain sequence
+    cursor.execute(f"CREATE SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+    cursor.execute(f"SELECT setval('{TABLE}_id_seq', %s, %s)", [max(max_id, 1), max_id > 0])
+    cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq')")
+
+    # The primary key of a partitioned table must include the partition key
+    key = "id, created_at" if partitioned else "id"
+    cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY ({key})")
+    for definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+
+
+def partition_audit_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        _rebuild(cursor, partitioned=True)
+
+
+def unpartition_audit_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        _rebuild(cursor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0009_auditevent_clinic_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_audit_table, unpartition_audit_table),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-17 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0010_partition_auditevent"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditevent",
+            index=models.Index(fields=["clinic", "actor", "created_at"], name="audit_audit_clinic__5343cd_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditevent",
+            index=models.Index(fields=["clinic", "action", "created_at"], name="audit_audit_clinic__39c179_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditevent",
+            index=models.Index(fields=["clinic", "visit_id", "created_at"], name="audit_audit_clinic__84d2cf_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditevent",
+            index=models.Index(
+                fields=["clinic", "ip_address", "created_at"],
+                name="audit_audit_clinic__682d2b_idx",
+            ),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from clinics.models import Clinic
 from clinics.managers import ClinicManager
 
@@ -18,8 +19,12 @@ class AuditEvent(models.Model):
         USER_EDITED = "user_edited", "User edited"
         USER_DEACTIVATED = "user_deactivated", "User deactivated"
         CLINIC_UPDATED = "clinic_updated", "Clinic settings updated"
+        PATIENTS_IMPORTED = "patients_imported", "Patients imported"
+        VISITS_IMPORTED = "visits_imported", "Visits imported"
+        CLINIC_EXPORTED = "clinic_exported", "Clinic data exported"
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event is built (not when it is inserted) so buffered writes keep event time
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     # ✅ tenant / clinic scoping
     clinic = models.ForeignKey(
@@ -53,4 +58,16 @@ class AuditEvent(models.Model):
     objects = ClinicManager()
 
     def __str__(self):
-        return f"{self.created_at} - {self.action} - {self.object_type}:{self.object_id}"
\ No newline at end of file
+        return f"{self.created_at} - {self.action} - {self.object_type}:{self.object_id}"
+
+    class Meta:
+        indexes = [
+            # Clinic activity feed (admin dashboard) and the patient audit trail (patient_detail)
+            models.Index(fields=["clinic", "created_at"]),
+            models.Index(fields=["clinic", "patient_id", "created_at"]),
+            # Audit search filters (audit.views): equality on the filter, range/order on created_at
+            models.Index(fields=["clinic", "actor", "created_at"]),
+            models.Index(fields=["clinic", "action", "created_at"]),
+            models.Index(fields=["clinic", "visit_id", "created_at"]),
+            models.Index(fields=["clinic", "ip_address", "created_at"]),
+        ]
\ No newline at end of file
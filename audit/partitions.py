@@ -0,0 +1,101 @@
+"""
+Monthly partitions of the audit table on PostgreSQL.
+
+Migration 0010 turns audit_auditevent into a table partitioned by range of
+created_at, one partition per calendar month (UTC) named
+audit_auditevent_pYYYYMM, plus a default partition for anything outside
+them. ensure_partitions() keeps a few months of partitions ready ahead of
+time and drop_partitions_before() removes whole months once they have been
+archived (see audit.archive), which is far cheaper than DELETE.
+
+On other databases the table is not partitioned and these helpers do nothing.
+"""
+import datetime
+
+from django.db import connection
+
+from .models import AuditEvent
+
+TABLE = AuditEvent._meta.db_table
+MONTHS_AHEAD = 3
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s)",
+            [TABLE],
+        )
+        return cursor.fetchone()[0]
+
+
+def monthly_partitions():
+    """{first day of month: partition name} of the existing monthly partitions."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    prefix = f"{TABLE}_p"
+    for name in names:
+        if name.startswith(prefix):
+            stamp = name[len(prefix):]
+            partitions[datetime.date(int(stamp[:4]), int(stamp[4:6]), 1)] = name
+    return partitions
+
+
+def ensure_partitions(months_ahead=MONTHS_AHEAD):
+    """
+    Create the partitions for the current month and the next ``months_ahead``
+    ones. Run regularly (archive_audit_events does) so that new events never
+    land in the default partition.
+    """
+    if not is_partitioned():
+        return []
+    existing = monthly_partitions()
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    current = datetime.date(today.year, today.month, 1)
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+            )
+            created.append(partition_name(month))
+    return created
+
+
+def drop_partitions_before(cutoff):
+    """Drop the monthly partitions that end on or before ``cutoff`` (a date). Returns their names."""
+    if not is_partitioned():
+        return []
+    dropped = []
+    with connection.cursor() as cursor:
+        for month, name in sorted(monthly_partitions().items()):
+            if add_months(month, 1) > cutoff:
+                continue
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+            cursor.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+    return dropped
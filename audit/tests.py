@@ -1,3 +1,75 @@
+import datetime
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.db import connection
+from django.db.models.deletion import Collector
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from clinics.models import Clinic
+from .archive import _ArchiveFile, archive_events, purge_events
+from .models import AuditEvent
+
+
+class PurgeEventsTests(TestCase):
+    def test_purge_is_one_delete_per_month(self):
+        clinic = Clinic.objects.create(name="Purge")
+        start = datetime.datetime(2024, 1, 15, tzinfo=datetime.timezone.utc)
+        AuditEvent.objects.bulk_create([
+            AuditEvent(
+                clinic=clinic, action=AuditEvent.Action.PATIENT_VIEWED, object_type="patients.Patient",
+                object_id=n, created_at=start + datetime.timedelta(days=n),
+            )
+            for n in range(60)
+        ])
+        kept = AuditEvent.objects.create(
+            clinic=clinic, action=AuditEvent.Action.PATIENT_VIEWED, object_type="patients.Patient", object_id=1,
+        )
+        cutoff = datetime.datetime(2024, 3, 1, tzinfo=datetime.timezone.utc)
+
+        # Signals or relations on AuditEvent would make Django load each row before deleting
+        self.assertTrue(Collector(using="default").can_fast_delete(AuditEvent.objects.all()))
+        with CaptureQueriesContext(connection) as ctx:
+            deleted, _ = purge_events(cutoff)
+
+        self.assertEqual(deleted, 46)
+        deletes = [query["sql"] for query in ctx.captured_queries if query["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 2)  # January and February
+        self.assertFalse(any(
+            query["sql"].startswith("SELECT") and "LIMIT 1" not in query["sql"] for query in ctx.captured_queries
+        ))
+        self.assertFalse(AuditEvent.objects.filter(created_at__lt=cutoff).exists())
+        self.assertEqual(AuditEvent.objects.count(), 15)
+        self.assertTrue(AuditEvent.objects.filter(pk=kept.pk).exists())
+
+
+class ArchiveEventsTests(TestCase):
+    def test_failed_run_leaves_no_archive_files(self):
+        clinic = Clinic.objects.create(name="Archive")
+        AuditEvent.objects.bulk_create([
+            AuditEvent(
+                clinic=clinic, action=AuditEvent.Action.PATIENT_VIEWED, object_type="patients.Patient",
+                object_id=n, created_at=datetime.datetime(2024, 1, 1 + n, tzinfo=datetime.timezone.utc),
+            )
+            for n in range(3)
+        ])
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+
+        write = _ArchiveFile.write
+        calls = []
+
+        def failing_write(archive, row):
+            calls.append(row)
+            if len(calls) == 2:
+                raise OSError("disk full")
+            write(archive, row)
+
+        with mock.patch.object(_ArchiveFile, "write", failing_write):
+            with self.assertRaises(OSError):
+                archive_events(datetime.datetime(2024, 2, 1, tzinfo=datetime.timezone.utc), root=root)
 
-# Create your tests here.
+        self.assertEqual(os.listdir(os.path.join(root, f"clinic_{clinic.pk}")), [])
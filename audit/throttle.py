@@ -0,0 +1,29 @@
+"""
+Throttling of repetitive audit events (e.g. one PATIENT_VIEWED per user and
+patient every AUDIT_VIEW_THROTTLE_SECONDS).
+
+The marker lives in the cache framework rather than the session: cache.add()
+is a single atomic set-if-absent with a TTL, so checking costs no database
+write and the session is left untouched. With a cache shared by all workers
+(see CACHES) the throttle holds across processes; with the default
+local-memory cache it is per process, which can only log an event more often,
+never less.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+
+def throttle_key(action, user_id, object_id):
+    return f"audit_throttle:{action}:{user_id}:{object_id}"
+
+
+def should_log(action, user, object_id, timeout=None):
+    """
+    True the first time ``user`` triggers ``action`` on ``object_id`` within
+    ``timeout`` seconds (defaults to AUDIT_VIEW_THROTTLE_SECONDS), False after.
+    """
+    if timeout is None:
+        timeout = settings.AUDIT_VIEW_THROTTLE_SECONDS
+    if timeout <= 0:
+        return True
+    return cache.add(throttle_key(action, user.pk, object_id), True, timeout)
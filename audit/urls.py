@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = "audit"
+
+urlpatterns = [
+    path("", views.audit_search, name="search"),
+    path("events.json", views.audit_search_json, name="search_json"),
+    path("events.csv", views.audit_search_csv, name="search_csv"),
+]
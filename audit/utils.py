@@ -1,4 +1,6 @@
+from clinics.models import Clinic
 from .models import AuditEvent
+from .writer import get_audit_writer
 
 
 def get_client_ip(request):
@@ -8,34 +10,35 @@ def get_client_ip(request):
     return request.META.get("REMOTE_ADDR")
 
 
-def log_event(request, *, action, obj, patient_id=None, visit_id=None, metadata=None):
-    user = getattr(request, "user", None)
-    actor = user if getattr(user, "is_authenticated", False) else None
-
-    clinic = None
+def log_event(request, *, action, obj, patient_id=None, visit_id=None, metadata=None, actor=None):
+    # ``request`` may be None (management commands); pass ``actor`` explicitly then
+    if actor is None:
+        user = getattr(request, "user", None)
+        actor = user if getattr(user, "is_authenticated", False) else None
 
+    # Resolve the clinic by id only; loading the Clinic row is never needed here.
     # 1) Prefer object's clinic if it exists
-    if hasattr(obj, "clinic_id"):
-        clinic = getattr(obj, "clinic", None)
+    clinic_id = getattr(obj, "clinic_id", None)
+    if clinic_id is None and isinstance(obj, Clinic):
+        clinic_id = obj.pk
 
     # 2) If not, resolve via patient_id or visit_id
-    if clinic is None and patient_id:
+    if clinic_id is None and patient_id:
         from patients.models import Patient
         clinic_id = Patient.objects.filter(pk=patient_id).values_list("clinic_id", flat=True).first()
-        if clinic_id:
-            from clinics.models import Clinic
-            clinic = Clinic.objects.get(pk=clinic_id)
 
-    if clinic is None and visit_id:
+    if clinic_id is None and visit_id:
         from visits.models import Visit
-        clinic = Visit.objects.filter(pk=visit_id).values_list("clinic", flat=True).first()
+        clinic_id = Visit.objects.filter(pk=visit_id).values_list("clinic_id", flat=True).first()
 
-    # 3) Fallback to user's clinic
-    if clinic is None and actor is not None:
-        clinic = getattr(actor, "clinic", None)
+    # 3) Fallback to the request's / user's clinic
+    if clinic_id is None:
+        clinic_id = getattr(getattr(request, "clinic", None), "pk", None)
+    if clinic_id is None and actor is not None:
+        clinic_id = getattr(actor, "clinic_id", None)
 
-    AuditEvent.objects.create(
-        clinic=clinic if hasattr(clinic, "pk") else None,
+    event = AuditEvent(
+        clinic_id=clinic_id,
         actor=actor,
         action=action,
         object_type=f"{obj.__class__.__module__}.{obj.__class__.__name__}",
@@ -45,4 +48,6 @@ def log_event(request, *, action, obj, patient_id=None, visit_id=None, metadata=
         ip_address=get_client_ip(request) if request else None,
         user_agent=request.META.get("HTTP_USER_AGENT", "") if request else "",
         metadata=metadata or {},
-    )
\ No newline at end of file
+    )
+    get_audit_writer().write(event)
+    return event
@@ -1,3 +1,130 @@
+import csv
+
+from django.contrib.auth.decorators import login_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils import timezone
+
+from accounts.permissions import role_required
+from clinics.pagination import InvalidCursor, KeysetPaginator
+from .forms import AuditSearchForm
+from .models import AuditEvent
+
+PAGE_SIZE = 50
+CSV_CHUNK_SIZE = 2000
+# Newest first; every filter index ends with created_at, id breaks ties
+ORDERING = ("-created_at", "-id")
+FIELDS = (
+    "id", "created_at", "actor_id", "actor__username", "action", "object_type", "object_id",
+    "patient_id", "visit_id", "ip_address", "user_agent", "metadata",
+)
+
+
+def _search(request):
+    """Bound search form and the filtered, clinic-scoped queryset (None if the form is invalid)."""
+    form = AuditSearchForm(request.GET, clinic=request.clinic)
+    if not form.is_valid():
+        return form, None
+    # ✅ scope by clinic
+    events = form.filter(AuditEvent.objects.for_clinic(request.clinic))
+    return form, events
+
+
+def _filter_query(request):
+    """The query string without the cursor, to build page links."""
+    query = request.GET.copy()
+    query.pop("cursor", None)
+    return query.urlencode()
+
+
+@login_required
+@role_required("admin")
+def audit_search(request):
+    form, events = _search(request)
+    page_obj = None
+    if events is not None:
+        paginator = KeysetPaginator(events.select_related("actor"), PAGE_SIZE, ordering=ORDERING)
+        page_obj = paginator.get_page(request.GET.get("cursor"))
+
+    return render(request, "audit/audit_search.html", {
+        "form": form,
+        "page_obj": page_obj,
+        "query": _filter_query(request),
+    })
+
+
+@login_required
+@role_required("admin")
+def audit_search_json(request):
+    """
+    Same filters as audit_search. Returns {"results": [...], "next_cursor",
+    "previous_cursor"}; pass a cursor back as ?cursor= for the next page.
+    """
+    form, events = _search(request)
+    if events is None:
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    paginator = KeysetPaginator(events.select_related("actor"), PAGE_SIZE, ordering=ORDERING)
+    try:
+        page_obj = paginator.page(request.GET.get("cursor"))
+    except InvalidCursor:
+        return JsonResponse({"errors": {"cursor": ["Invalid cursor."]}}, status=400)
+
+    results = [
+        {
+            "id": event.pk,
+            "created_at": event.created_at,
+            "actor_id": event.actor_id,
+            "actor": event.actor.username if event.actor else None,
+            "action": event.action,
+            "object_type": event.object_type,
+            "object_id": event.object_id,
+            "patient_id": event.patient_id,
+            "visit_id": event.visit_id,
+            "ip_address": event.ip_address,
+            "user_agent": event.user_agent,
+            "metadata": event.metadata,
+        }
+        for event in page_obj
+    ]
+    return JsonResponse(
+        {
+            "results": results,
+            "next_cursor": page_obj.next_cursor,
+            "previous_cursor": page_obj.previous_cursor,
+        },
+        encoder=DjangoJSONEncoder,
+    )
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_rows(events):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(field.replace("__username", "") for field in FIELDS)
+    rows = events.order_by(*ORDERING).values_list(*FIELDS).iterator(chunk_size=CSV_CHUNK_SIZE)
+    for row in rows:
+        yield writer.writerow(
+            DjangoJSONEncoder().encode(value) if isinstance(value, (dict, list)) else value
+            for value in row
+        )
+
+
+@login_required
+@role_required("admin")
+def audit_search_csv(request):
+    """All events matching the audit_search filters, streamed as CSV."""
+    form, events = _search(request)
+    if events is None:
+        return HttpResponseBadRequest("Invalid filters")
 
-# Create your views here.
+    response = StreamingHttpResponse(_csv_rows(events), content_type="text/csv")
+    filename = f"audit-{request.clinic.pk}-{timezone.localdate():%Y%m%d}.csv"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
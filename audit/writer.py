@@ -0,0 +1,159 @@
+"""
+Audit event writers.
+
+log_event() builds an unsaved AuditEvent and hands it to the writer selected
+by settings.AUDIT_WRITE_MODE:
+
+- "sync" (default): the event is inserted immediately, inside the request.
+- "buffered": the event is queued in-process and a background thread inserts
+  batches with bulk_create once AUDIT_BATCH_SIZE events are waiting or
+  AUDIT_FLUSH_INTERVAL seconds have passed. Pending events are flushed when
+  the process exits normally (atexit); events still queued when a process is
+  killed outright are lost, so keep the interval short.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+from django.dispatch import receiver
+
+from clinics.caching import bump_patient_fragments
+from .models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+class SyncAuditWriter:
+    def write(self, event):
+        event.save()
+
+    def flush(self):
+        pass
+
+
+class BufferedAuditWriter:
+    def __init__(self, batch_size=200, flush_interval=2.0):
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._atexit_registered = False
+
+    def write(self, event):
+        self._ensure_started()
+        self.queue.put(event)
+
+    def flush(self):
+        """Block until every event queued so far has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.join()
+        else:
+            self._drain()
+
+    def shutdown(self, timeout=10.0):
+        """Stop the background thread after writing everything still queued."""
+        self._stopping.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        self._drain()
+
+    def _ensure_started(self):
+        # Started lazily (and again after a fork) so preloaded workers each get their own thread
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                # Events inherited from the parent process belong to the parent
+                self.queue = queue.Queue()
+            self._stopping.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.shutdown)
+                self._atexit_registered = True
+
+    def _run(self):
+        while not (self._stopping.is_set() and self.queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _collect(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or (self._stopping.is_set() and self.queue.empty()):
+                break
+            try:
+                batch.append(self.queue.get(timeout=min(timeout, 0.5)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    def _write(self, batch):
+        close_old_connections()
+        try:
+            AuditEvent.objects.bulk_create(batch, batch_size=self.batch_size)
+        except Exception:
+            logger.exception("Bulk audit write of %d events failed; retrying one by one", len(batch))
+        else:
+            # bulk_create sends no post_save (see clinics.signals)
+            bump_patient_fragments((event.patient_id for event in batch), "audit")
+            return
+
+        for event in batch:
+            try:
+                event.save()
+            except Exception:
+                logger.exception(
+                    "Dropping audit event %s on %s:%s (clinic %s, actor %s)",
+                    event.action, event.object_type, event.object_id, event.clinic_id, event.actor_id,
+                )
+
+
+@lru_cache(maxsize=None)
+def get_audit_writer():
+    mode = getattr(settings, "AUDIT_WRITE_MODE", "sync")
+    if mode == "buffered":
+        return BufferedAuditWriter(
+            batch_size=getattr(settings, "AUDIT_BATCH_SIZE", 200),
+            flush_interval=getattr(settings, "AUDIT_FLUSH_INTERVAL", 2.0),
+        )
+    if mode != "sync":
+        logger.warning("Unknown AUDIT_WRITE_MODE %r, writing audit events synchronously", mode)
+    return SyncAuditWriter()
+
+
+@receiver(setting_changed)
+def _reset_audit_writer(setting, **kwargs):
+    if setting in ("AUDIT_WRITE_MODE", "AUDIT_BATCH_SIZE", "AUDIT_FLUSH_INTERVAL"):
+        get_audit_writer().flush()
+        get_audit_writer.cache_clear()
@@ -1,7 +1,69 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+
 from .models import Clinic
+from .pagination import KeysetPaginator
+
+CURSOR_VAR = "cursor"
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Admin changelist paged with KeysetPaginator instead of COUNT(*) + OFFSET.
+    Page links carry an opaque ``cursor`` query parameter.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Changing filters or search must restart from the first page
+        new_params = new_params or {}
+        if CURSOR_VAR not in new_params:
+            remove = [*(remove or []), CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        paginator = KeysetPaginator(self.queryset, self.list_per_page, ordering=self.model_admin.keyset_ordering)
+        page = paginator.get_page(self.cursor)
+
+        self.keyset_page = page
+        self.result_list = page.object_list
+        self.result_count = len(self.result_list)
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.can_show_all = False
+        self.multi_page = page.has_other_pages()
+        self.paginator = paginator
+
+        self.next_page_url = self.get_query_string({CURSOR_VAR: page.next_cursor}) if page.has_next() else None
+        self.previous_page_url = (
+            self.get_query_string({CURSOR_VAR: page.previous_cursor}) if page.has_previous() else None
+        )
+
+
+class KeysetPaginationMixin:
+    """
+    ModelAdmin mixin for very large tables. Set ``keyset_ordering`` to an
+    indexed ordering ending with a unique column; column sorting is disabled
+    because it would bypass that index.
+    """
+    keyset_ordering = ("-pk",)
+    sortable_by = ()
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
 
 @admin.register(Clinic)
 class ClinicAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "phone", "created_at")
-    search_fields = ("name", "phone")
\ No newline at end of file
+    list_display = ("id", "name", "phone", "patient_count", "visit_count", "attachment_count", "created_at")
+    search_fields = ("name", "phone")
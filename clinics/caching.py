@@ -0,0 +1,45 @@
+"""
+Version tokens of the cached patient page fragments.
+"""
+import uuid
+
+from django.core.cache import cache
+
+
+# patients/patient_detail.html caches its visit history, attachment grid and
+# audit table with {% cache %}, keyed on the patient and the section's version.
+# A version is a random token replaced whenever a row of the section changes
+# (clinics.signals, and the bulk paths that skip signals), so a stale fragment
+# is never read again. Tokens are random rather than counters so that a token
+# evicted from the cache can never come back with a value an old fragment used.
+
+PATIENT_SECTIONS = ("visits", "attachments", "audit")
+
+
+def fragment_version_key(patient_id, section):
+    return f"patient_fragment:{patient_id}:{section}"
+
+
+def patient_fragment_versions(patient_id):
+    """{section: version} for ``patient_id``, creating missing versions."""
+    keys = {fragment_version_key(patient_id, section): section for section in PATIENT_SECTIONS}
+    found = cache.get_many(list(keys))
+    missing = {key: uuid.uuid4().hex for key in keys if key not in found}
+    if missing:
+        for key, token in missing.items():
+            # add() keeps a version another request created meanwhile
+            if not cache.add(key, token, None):
+                token = cache.get(key, token)
+            found[key] = token
+    return {section: found[key] for key, section in keys.items()}
+
+
+def bump_patient_fragments(patient_ids, *sections):
+    """Invalidate the cached ``sections`` of the patient page of every id in ``patient_ids``."""
+    tokens = {
+        fragment_version_key(patient_id, section): uuid.uuid4().hex
+        for patient_id in set(patient_ids) if patient_id is not None
+        for section in sections
+    }
+    if tokens:
+        cache.set_many(tokens, None)
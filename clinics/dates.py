@@ -0,0 +1,23 @@
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def parse_date_or_datetime(value):
+    """
+    Aware datetime for a date (YYYY-MM-DD, taken as midnight) or an ISO 8601
+    datetime, as accepted by ?since= and the --since/--until options.
+    Raises ValueError for anything else.
+    """
+    try:
+        since = parse_datetime(value) or parse_date(value)
+    except ValueError:  # well formed but not a real date, e.g. 2026-02-30
+        since = None
+    if since is None:
+        raise ValueError(f"{value!r} is not a date (YYYY-MM-DD) or an ISO 8601 datetime")
+    if not isinstance(since, datetime.datetime):
+        since = datetime.datetime.combine(since, datetime.time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
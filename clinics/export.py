@@ -0,0 +1,197 @@
+"""
+Streaming export of a clinic's data.
+
+The export is a zip archive holding one file per table (patients, visits,
+attachments metadata, audit events) as NDJSON or CSV, a manifest.json and,
+optionally, the attachment files themselves under files/. Rows are read with
+.iterator(chunk_size=EXPORT_CHUNK_SIZE) and written straight into the
+archive, and generate_export() yields after every batch so that a caller
+writing to a socket (see clinics.views.clinic_export) can pass the bytes on.
+Memory use therefore stays flat however many rows the clinic has.
+
+With ``since``, only rows created or updated at or after that time are
+exported (audit events and attachments never change after creation).
+Deletions are not part of an incremental export.
+"""
+import csv
+import io
+import json
+import zipfile
+from dataclasses import dataclass
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from audit.models import AuditEvent
+from files.models import Attachment
+from patients.models import Patient
+from visits.models import Visit
+
+EXPORT_CHUNK_SIZE = 2000
+FORMATS = ("ndjson", "csv")
+
+
+@dataclass(frozen=True)
+class ExportSection:
+    name: str
+    model: type
+    fields: tuple
+    since_field: str
+
+
+SECTIONS = (
+    ExportSection(
+        "patients", Patient,
+        ("id", "full_name", "phone", "national_id", "sex", "date_of_birth", "address", "notes",
+         "created_at", "updated_at"),
+        "updated_at",
+    ),
+    ExportSection(
+        "visits", Visit,
+        ("id", "patient_id", "doctor_id", "visit_datetime", "chief_complaint", "clinical_notes", "diagnosis",
+         "treatment_plan", "follow_up_date", "created_at", "updated_at"),
+        "updated_at",
+    ),
+    ExportSection(
+        "attachments", Attachment,
+        ("id", "patient_id", "visit_id", "uploaded_by_id", "original_filename", "file", "file_type", "file_size",
+         "mime_type", "sha256", "title", "notes", "uploaded_at"),
+        "uploaded_at",
+    ),
+    ExportSection(
+        "audit_events", AuditEvent,
+        ("id", "created_at", "actor_id", "action", "object_type", "object_id", "patient_id", "visit_id",
+         "ip_address", "user_agent", "metadata"),
+        "created_at",
+    ),
+)
+
+
+class StreamBuffer:
+    """Write-only file object whose contents are collected with drain()."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def section_queryset(section, clinic, since=None):
+    qs = section.model.objects.for_clinic(clinic).order_by("pk")
+    if since is not None:
+        qs = qs.filter(**{f"{section.since_field}__gte": since})
+    return qs
+
+
+def write_section(fh, section, clinic, fmt="ndjson", since=None):
+    """
+    Write ``section`` rows to the text file ``fh``, yielding after each
+    batch. Returns (as the generator's value) the number of rows written.
+    """
+    rows = section_queryset(section, clinic, since).values_list(*section.fields).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+    writer = None
+    if fmt == "csv":
+        writer = csv.writer(fh)
+        writer.writerow(section.fields)
+
+    count = 0
+    for row in rows:
+        if writer is not None:
+            writer.writerow(
+                json.dumps(value, cls=DjangoJSONEncoder) if isinstance(value, (dict, list)) else value
+                for value in row
+            )
+        else:
+            fh.write(json.dumps(dict(zip(section.fields, row)), cls=DjangoJSONEncoder, ensure_ascii=False))
+            fh.write("\n")
+        count += 1
+        if count % EXPORT_CHUNK_SIZE == 0:
+            fh.flush()
+            yield
+    fh.flush()
+    return count
+
+
+def write_files(zf, clinic, since=None):
+    """Copy attachment files into ``zf`` under files/, yielding after each one."""
+    written = set()
+    missing = 0
+    attachments = next(section for section in SECTIONS if section.model is Attachment)
+    names = section_queryset(attachments, clinic, since).values_list("file", flat=True).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+    storage = Attachment._meta.get_field("file").storage
+    for name in names:
+        # Content-addressed blobs can be shared by several attachments
+        if not name or name in written:
+            continue
+        written.add(name)
+        try:
+            source = storage.open(name, "rb")
+        except FileNotFoundError:
+            missing += 1
+            continue
+        # Stored, not deflated: scans and PDFs are already compressed
+        entry = zipfile.ZipInfo(f"files/{name}", date_time=timezone.localtime().timetuple()[:6])
+        entry.compress_type = zipfile.ZIP_STORED
+        with source, zf.open(entry, "w", force_zip64=True) as target:
+            for chunk in iter(lambda: source.read(64 * 1024), b""):
+                target.write(chunk)
+                yield
+        yield
+    return len(written) - missing, missing
+
+
+def generate_export(fileobj, clinic, fmt="ndjson", since=None, include_files=False):
+    """
+    Write the export zip of ``clinic`` to the binary file ``fileobj``
+    (which need not be seekable), yielding after each batch of rows.
+    """
+    ext = "csv" if fmt == "csv" else "ndjson"
+    manifest = {
+        "clinic": {"id": clinic.pk, "name": clinic.name},
+        "exported_at": timezone.now(),
+        "since": since,
+        "format": fmt,
+        "counts": {},
+    }
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for section in SECTIONS:
+            with zf.open(f"{section.name}.{ext}", "w", force_zip64=True) as raw:
+                with io.TextIOWrapper(raw, encoding="utf-8", newline="") as text:
+                    manifest["counts"][section.name] = yield from write_section(text, section, clinic, fmt, since)
+        if include_files:
+            manifest["counts"]["files"], manifest["counts"]["missing_files"] = yield from write_files(zf, clinic, since)
+        zf.writestr("manifest.json", json.dumps(manifest, cls=DjangoJSONEncoder, indent=2))
+    return manifest
+
+
+def exhaust(writer):
+    """Run a writer generator to completion and return its value."""
+    while True:
+        try:
+            next(writer)
+        except StopIteration as stop:
+            return stop.value
+
+
+def stream_export(clinic, **options):
+    """Iterate over the bytes of the export zip (for StreamingHttpResponse)."""
+    buffer = StreamBuffer()
+    for _ in generate_export(buffer, clinic, **options):
+        data = buffer.drain()
+        if data:
+            yield data
+    yield buffer.drain()
@@ -0,0 +1,169 @@
+"""
+Shared machinery of the bulk import commands (import_patients, import_visits).
+
+Input is streamed from a CSV file (with a header row) or a JSON Lines file,
+one record per line, read in chunks of --batch-size records: the command's
+prepare_batch() sees each chunk first (to normalize whole columns at once),
+then build_object() turns each record into a model instance. Instances are
+inserted with bulk_create in batches of --batch-size, one transaction per
+batch, so a failure never leaves a partial batch behind. A single summary
+audit event is written per import.
+"""
+import csv
+import itertools
+import json
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from audit.utils import log_event
+from .models import Clinic
+
+MAX_REPORTED_ROWS = 20
+
+
+class SkipRow(Exception):
+    """The record is rejected; the message says why."""
+
+
+class DuplicateRow(SkipRow):
+    """The record duplicates existing data (or an earlier record)."""
+
+
+def read_records(path, fmt=None):
+    """Yield (line number, dict) for each record of ``path`` ("-" for stdin)."""
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    fh = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(fh)
+            for record in reader:
+                yield reader.line_num, {key: (value or "").strip() for key, value in record.items() if key}
+        elif fmt == "jsonl":
+            for line_number, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as exc:
+                    raise CommandError(f"Line {line_number}: invalid JSON ({exc})")
+                if not isinstance(record, dict):
+                    raise CommandError(f"Line {line_number}: expected a JSON object")
+                yield line_number, {key: "" if value is None else str(value).strip() for key, value in record.items()}
+        else:
+            raise CommandError(f"Unknown format {fmt!r} (use csv or jsonl)")
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+class BaseImportCommand(BaseCommand):
+    audit_action = None
+    object_name = "rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='CSV or JSON Lines file ("-" for stdin).')
+        parser.add_argument("--clinic", type=int, required=True, help="Id of the clinic to import into.")
+        parser.add_argument("--format", choices=("csv", "jsonl"), help="Input format. Defaults to the file extension.")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows per INSERT / transaction (default 1000)."
+        )
+        parser.add_argument("--actor", help="Username recorded as the actor of the import audit event.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and report without writing anything.")
+
+    def prepare(self, clinic):
+        """Load whatever in-memory indexes build_object() needs."""
+
+    def prepare_batch(self, records):
+        """Called with each chunk of records (dicts) before build_object() sees them."""
+
+    def build_object(self, record):
+        """Return an unsaved instance for ``record`` or raise SkipRow / DuplicateRow."""
+        raise NotImplementedError
+
+    def insert(self, objs, batch_size):
+        raise NotImplementedError
+
+    def handle(self, *args, path, clinic, format=None, batch_size=1000, actor=None, dry_run=False, **options):
+        try:
+            self.clinic = Clinic.objects.get(pk=clinic)
+        except Clinic.DoesNotExist:
+            raise CommandError(f"Clinic {clinic} does not exist.")
+        actor_user = None
+        if actor:
+            try:
+                actor_user = get_user_model().objects.get(username=actor)
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {actor!r} does not exist.")
+        batch_size = max(1, batch_size)
+
+        started = time.monotonic()
+        self.prepare(self.clinic)
+        created = duplicates = 0
+        errors = []
+        batch = []
+
+        def flush():
+            nonlocal created
+            if batch and not dry_run:
+                try:
+                    with transaction.atomic():
+                        self.insert(batch, batch_size)
+                except IntegrityError as exc:
+                    raise CommandError(
+                        f"Batch ending at line {line_number} failed ({exc}); "
+                        f"{created} {self.object_name} were imported before it."
+                    )
+            created += len(batch)
+            batch.clear()
+            if options["verbosity"] >= 2:
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"{created} {self.object_name} ({created / elapsed if elapsed else created:.0f}/s)")
+
+        line_number = 0
+        records = read_records(path, format)
+        while chunk := list(itertools.islice(records, batch_size)):
+            self.prepare_batch([record for _, record in chunk])
+            for line_number, record in chunk:
+                try:
+                    batch.append(self.build_object(record))
+                except DuplicateRow as exc:
+                    duplicates += 1
+                    errors.append((line_number, str(exc)))
+                except SkipRow as exc:
+                    errors.append((line_number, str(exc)))
+                if len(batch) >= batch_size:
+                    flush()
+        flush()
+
+        elapsed = time.monotonic() - started
+        rejected = len(errors) - duplicates
+        for line, message in errors[:MAX_REPORTED_ROWS]:
+            self.stderr.write(f"Line {line}: {message}")
+        if len(errors) > MAX_REPORTED_ROWS:
+            self.stderr.write(f"... and {len(errors) - MAX_REPORTED_ROWS} more skipped rows")
+
+        if not dry_run and created:
+            log_event(
+                None,
+                action=self.audit_action,
+                obj=self.clinic,
+                actor=actor_user,
+                metadata={
+                    "source": path,
+                    "created": created,
+                    "duplicates": duplicates,
+                    "rejected": rejected,
+                    "seconds": round(elapsed, 2),
+                },
+            )
+
+        verb = "Would import" if dry_run else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {created} {self.object_name} into {self.clinic} in {elapsed:.1f}s "
+            f"({created / elapsed if elapsed else created:.0f}/s); "
+            f"skipped {duplicates} duplicate(s) and {rejected} invalid row(s)."
+        ))
@@ -0,0 +1,200 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Max, Min
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from clinics.models import Clinic
+from files.models import Attachment
+from patients.models import Patient
+from visits.models import Visit
+
+SAMPLE_SIZE = 200
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main views in-process with the Django test client: each view is requested "
+        "--requests times from --concurrency threads, as the admin of a clinic (by default the "
+        "largest seed_synthetic clinic). Prints p50/p95/p99 latency and throughput per view as JSON. "
+        "Requests are audited like any others, so run it against a synthetic database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clinic", type=int, help="Clinic to benchmark. Defaults to the one with most patients.")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per view (default 200).")
+        parser.add_argument("--concurrency", type=int, default=4, help="Concurrent clients (default 4).")
+        parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per view first (default 10).")
+        parser.add_argument("--views", help="Comma-separated subset of views to run (see --list).")
+        parser.add_argument("--list", action="store_true", help="List the benchmarked views and exit.")
+        parser.add_argument("--label", default="", help="Free text stored in the result, e.g. a commit id.")
+        parser.add_argument("--output", help="Write the JSON result to this file instead of stdout.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for picking objects.")
+
+    def handle(self, *args, **options):
+        scenarios = self.scenarios()
+        if options["list"]:
+            for name in scenarios:
+                self.stdout.write(name)
+            return
+        if options["views"]:
+            wanted = [name.strip() for name in options["views"].split(",")]
+            unknown = set(wanted) - set(scenarios)
+            if unknown:
+                raise CommandError(f"Unknown view(s): {', '.join(sorted(unknown))}. Use --list.")
+            scenarios = {name: scenarios[name] for name in wanted}
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+
+        clinic = self.get_clinic(options["clinic"])
+        user = User.objects.filter(clinic=clinic, role="admin", is_active=True).order_by("pk").first()
+        if user is None:
+            raise CommandError(f"Clinic {clinic.pk} has no active admin user.")
+        samples = self.samples(clinic, random.Random(options["seed"]))
+
+        results = {}
+        for name, scenario in scenarios.items():
+            results[name] = self.run(scenario, samples, user, options)
+            if options["verbosity"] >= 2:
+                self.stderr.write(f"{name}: {results[name]}")
+
+        report = {
+            "label": options["label"],
+            "started_at": timezone.now(),
+            "database": connection.vendor,
+            "clinic": {"id": clinic.pk, "patients": clinic.patient_count, "visits": clinic.visit_count},
+            "requests_per_view": options["requests"],
+            "concurrency": options["concurrency"],
+            "views": results,
+        }
+        output = json.dumps(report, indent=2, default=str)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(output + "\n")
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+        else:
+            self.stdout.write(output)
+
+    def scenarios(self):
+        """{view name: function(samples, rng) -> URL}."""
+        return {
+            "patients:list": lambda s, rng: reverse("patients:list"),
+            "patients:list (search)": lambda s, rng: reverse("patients:list") + "?q=" + rng.choice(s["names"]),
+            "patients:detail": lambda s, rng: reverse("patients:detail", args=[rng.choice(s["patients"])]),
+            "patients:admin_dashboard": lambda s, rng: reverse("patients:admin_dashboard"),
+            "visits:edit": lambda s, rng: reverse("visits:edit", args=[rng.choice(s["visits"])]),
+            "files:download": lambda s, rng: reverse("files:download", args=[rng.choice(s["attachments"])]),
+            "accounts:list": lambda s, rng: reverse("accounts:list"),
+            "audit:search": lambda s, rng: reverse("audit:search") + f"?patient_id={rng.choice(s['patients'])}",
+        }
+
+    def get_clinic(self, clinic_id):
+        if clinic_id is not None:
+            try:
+                return Clinic.objects.get(pk=clinic_id)
+            except Clinic.DoesNotExist:
+                raise CommandError(f"Clinic {clinic_id} does not exist.")
+        clinic = Clinic.objects.order_by("-patient_count", "pk").first()
+        if clinic is None or not clinic.patient_count:
+            raise CommandError("No clinic with patients; run seed_synthetic first.")
+        return clinic
+
+    def samples(self, clinic, rng):
+        """Random ids (and name fragments) of the clinic's rows to spread requests over."""
+        def sample(queryset):
+            # Seek to random points of the pk range: one index lookup each, whatever the table size
+            bounds = queryset.aggregate(low=Min("pk"), high=Max("pk"))
+            if bounds["low"] is None:
+                return []
+            return sorted({
+                queryset.filter(pk__gte=rng.randint(bounds["low"], bounds["high"]))
+                .order_by("pk").values_list("pk", flat=True).first()
+                for _ in range(SAMPLE_SIZE)
+            })
+
+        patients = sample(Patient.objects.for_clinic(clinic))
+        samples = {
+            "patients": patients,
+            "names": list({
+                name.split()[0]
+                for name in Patient.objects.filter(pk__in=patients).values_list("full_name", flat=True)
+            }),
+            "visits": sample(Visit.objects.for_clinic(clinic)),
+            "attachments": sample(Attachment.objects.for_clinic(clinic)),
+        }
+        empty = [key for key, values in samples.items() if not values]
+        if empty:
+            raise CommandError(f"Clinic {clinic.pk} has no {', '.join(empty)}.")
+        return samples
+
+    def run(self, scenario, samples, user, options):
+        total = options["requests"]
+        concurrency = options["concurrency"]
+        host = next((host for host in settings.ALLOWED_HOSTS if host and host != "*"), "localhost").lstrip(".")
+        lock = threading.Lock()
+        latencies, statuses = [], {}
+        counter = iter(range(total))
+
+        def worker(worker_id):
+            rng = random.Random(options["seed"] * 1000 + worker_id)
+            client = Client(raise_request_exception=False, SERVER_NAME=host)
+            client.force_login(user)
+            try:
+                for _ in range(-(-options["warmup"] // concurrency)):
+                    self.fetch(client, scenario(samples, rng))
+                while True:
+                    with lock:
+                        if next(counter, None) is None:
+                            return
+                    url = scenario(samples, rng)
+                    started = time.perf_counter()
+                    status = self.fetch(client, url)
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed * 1000)
+                        statuses[status] = statuses.get(status, 0) + 1
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, range(concurrency)))
+        wall = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            "requests": len(latencies),
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            "throughput_rps": round(len(latencies) / wall, 1) if wall else None,
+            "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "p50_ms": round(percentile(latencies, 0.50), 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 0.95), 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 0.99), 2) if latencies else None,
+            "max_ms": round(latencies[-1], 2) if latencies else None,
+        }
+
+    @staticmethod
+    def fetch(client, url):
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        response.close()
+        return response.status_code
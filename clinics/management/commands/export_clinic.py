@@ -0,0 +1,67 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from audit.models import AuditEvent
+from audit.utils import log_event
+from clinics.dates import parse_date_or_datetime
+from clinics.export import FORMATS, SECTIONS, exhaust, generate_export, write_section
+from clinics.models import Clinic
+
+
+class Command(BaseCommand):
+    help = (
+        "Export a clinic's patients, visits, attachment metadata and audit events as NDJSON or CSV. "
+        "OUTPUT ending in .zip (or \"-\" for stdout) produces a zip archive, which can also hold the "
+        "attachment files; any other OUTPUT is created as a directory with one file per table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help='Zip file, "-" (zip to stdout) or directory.')
+        parser.add_argument("--clinic", type=int, required=True, help="Id of the clinic to export.")
+        parser.add_argument("--format", choices=FORMATS, default="ndjson")
+        parser.add_argument("--since", help="Only rows created/updated since this date or datetime.")
+        parser.add_argument("--include-files", action="store_true", help="Add the attachment files (zip only).")
+
+    def handle(self, *args, output, clinic, format="ndjson", since=None, include_files=False, **options):
+        try:
+            clinic = Clinic.objects.get(pk=clinic)
+        except Clinic.DoesNotExist:
+            raise CommandError(f"Clinic {clinic} does not exist.")
+        if since:
+            try:
+                since = parse_date_or_datetime(since)
+            except ValueError as exc:
+                raise CommandError(f"Invalid --since: {exc}.")
+        as_zip = output == "-" or output.endswith(".zip")
+        if include_files and not as_zip:
+            raise CommandError("--include-files needs a .zip output.")
+
+        if as_zip:
+            fileobj = sys.stdout.buffer if output == "-" else open(output, "wb")
+            try:
+                manifest = exhaust(generate_export(fileobj, clinic, fmt=format, since=since, include_files=include_files))
+            finally:
+                if fileobj is not sys.stdout.buffer:
+                    fileobj.close()
+            counts = manifest["counts"]
+        else:
+            os.makedirs(output, exist_ok=True)
+            counts = {}
+            for section in SECTIONS:
+                path = os.path.join(output, f"{section.name}.{format}")
+                with open(path, "w", encoding="utf-8", newline="") as fh:
+                    counts[section.name] = exhaust(write_section(fh, section, clinic, format, since))
+
+        log_event(
+            None,
+            action=AuditEvent.Action.CLINIC_EXPORTED,
+            obj=clinic,
+            metadata={"format": format, "since": since.isoformat() if since else None,
+                      "files": include_files, "counts": counts, "via": "command"},
+        )
+
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        # Keep stdout clean when the archive itself is written there
+        (self.stderr if output == "-" else self.stdout).write(self.style.SUCCESS(f"Exported {summary}."))
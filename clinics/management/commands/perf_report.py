@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from clinics.perf import collect
+
+SORT_KEYS = {
+    "count": lambda stats: stats["count"],
+    "queries": lambda stats: stats["avg"]["queries"],
+    "db": lambda stats: stats["sum"]["db_ms"],
+    "time": lambda stats: stats["sum"]["total_ms"],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Report per-view query counts, DB time, total time and response size collected by "
+        "clinics.middleware.PerfMiddleware in all processes (snapshots in PERF_STATS_DIR)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sort", choices=SORT_KEYS, default="time", help="Order views by this figure.")
+        parser.add_argument("--json", action="store_true", dest="as_json", help="Print the raw figures as JSON.")
+
+    def handle(self, *args, sort="time", as_json=False, **options):
+        views = collect()
+        if as_json:
+            self.stdout.write(json.dumps(views, indent=2, sort_keys=True))
+            return
+        if not views:
+            self.stdout.write("No requests recorded yet.")
+            return
+
+        header = f"{'view':<36} {'count':>7} {'avg q':>7} {'max q':>6} {'budget':>6} {'avg db ms':>10} " \
+                 f"{'avg ms':>9} {'max ms':>9} {'avg KB':>8} {'over':>5}"
+        self.stdout.write(header)
+        for name, stats in sorted(views.items(), key=lambda item: SORT_KEYS[sort](item[1]), reverse=True):
+            avg, top = stats["avg"], stats["max"]
+            budget = "-" if stats["budget"] is None else stats["budget"]
+            line = (
+                f"{name:<36} {stats['count']:>7} {avg['queries']:>7.1f} {top['queries']:>6} {budget:>6} "
+                f"{avg['db_ms']:>10.1f} {avg['total_ms']:>9.1f} {top['total_ms']:>9.1f} "
+                f"{avg['bytes'] / 1024:>8.1f} {stats['over_budget']:>5}"
+            )
+            self.stdout.write(self.style.WARNING(line) if stats["over_budget"] else line)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from clinics.stats import recount_clinic_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the patient/visit/attachment counters on each clinic and repair any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clinic",
+            type=int,
+            action="append",
+            dest="clinic_ids",
+            help="Only recount this clinic id (repeatable). Defaults to all clinics.",
+        )
+
+    def handle(self, *args, clinic_ids=None, **options):
+        drift = recount_clinic_counters(clinic_ids)
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("All clinic counters are accurate."))
+            return
+
+        for clinic_id, changed in drift.items():
+            details = ", ".join(f"{field} {old} -> {new}" for field, (old, new) in changed.items())
+            self.stdout.write(f"Clinic {clinic_id}: {details}")
+        self.stdout.write(self.style.SUCCESS(f"Repaired counters on {len(drift)} clinic(s)."))
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from clinics.models import Clinic
+from clinics.synthetic import seed_clinic
+
+ROLES = ("admin", "doctor", "assistant")
+
+
+class Command(BaseCommand):
+    help = (
+        "Create synthetic clinics filled with patients, visits, attachments (a shared dummy PDF) and "
+        "audit events for local load testing. Each clinic gets one user per role, named "
+        "synthetic<clinic id>-<role>."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clinics", type=int, default=1, help="Number of clinics to create (default 1).")
+        parser.add_argument("--patients", type=int, default=1000, help="Patients per clinic (default 1000).")
+        parser.add_argument("--visits", type=int, default=3, help="Visits per patient (default 3).")
+        parser.add_argument("--attachments", type=int, default=1, help="Attachments per patient (default 1).")
+        parser.add_argument("--audit-events", type=int, default=5, help="Audit events per patient (default 5).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Patients per batch (default 1000).")
+        parser.add_argument("--password", default="synthetic", help="Password of the generated users.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same data.")
+
+    def handle(self, *args, clinics=1, patients=1000, visits=3, attachments=1, audit_events=5, batch_size=1000,
+               password="synthetic", seed=0, **options):
+        if min(clinics, patients) < 1 or min(visits, attachments, audit_events) < 0 or batch_size < 1:
+            raise CommandError("Counts must not be negative and --clinics, --patients, --batch-size at least 1.")
+
+        started = time.monotonic()
+        totals = {"patients": 0, "visits": 0, "attachments": 0, "audit_events": 0}
+        for n in range(clinics):
+            clinic_started = time.monotonic()
+            clinic = Clinic.objects.create(name="Synthetic clinic")
+            # Named after its pk like its users, so names stay unique across runs and deletions
+            clinic.name = f"Synthetic clinic {clinic.pk}"
+            clinic.save(update_fields=["name"])
+            users = [
+                User.objects.create_user(f"synthetic{clinic.pk}-{role}", password=password, role=role, clinic=clinic)
+                for role in ROLES
+            ]
+            result = seed_clinic(
+                clinic,
+                patients=patients,
+                visits_per_patient=visits,
+                attachments_per_patient=attachments,
+                audit_events_per_patient=audit_events,
+                doctors=users[:2],
+                batch_size=batch_size,
+                seed=seed + n,
+            )
+            del result["patient_ids"]
+            for key, value in result.items():
+                totals[key] += value
+            self.stdout.write(
+                f"Clinic {clinic.pk}: {result['patients']} patients, {result['visits']} visits, "
+                f"{result['attachments']} attachments, {result['audit_events']} audit events "
+                f"in {time.monotonic() - clinic_started:.1f}s (users synthetic{clinic.pk}-admin/doctor/assistant)"
+            )
+
+        elapsed = time.monotonic() - started
+        rows = sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {clinics} clinic(s), {rows} rows in {elapsed:.1f}s ({rows / elapsed if elapsed else rows:.0f} rows/s)."
+        ))
@@ -1,7 +1,15 @@
 # clinics/middleware.py
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.shortcuts import redirect
 from django.urls import reverse
 
+from . import perf
+
 
 class ClinicMiddleware:
     """
@@ -40,4 +48,57 @@ class ClinicMiddleware:
             logout(request)
             return redirect(reverse("login") + "?no_clinic=1")
 
-        return self.get_response(request)
\ No newline at end of file
+        return self.get_response(request)
+
+
+class PerfMiddleware:
+    """
+    Records query count, DB time, total time and response size of every
+    request per URL name and enforces QUERY_BUDGETS (see clinics.perf).
+
+    Placed right before ClinicMiddleware so that the session, user and clinic
+    lookups count towards the view that triggered them.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERF_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        if match is None or not match.url_name:
+            return response
+        view_name = match.view_name
+        over_budget = perf.check_budget(view_name, counter.queries)
+        perf.recorder.record(view_name, {
+            "queries": counter.queries,
+            "db_ms": round(counter.seconds * 1000, 3),
+            "total_ms": round(total * 1000, 3),
+            "bytes": 0 if response.streaming else len(response.content),
+        }, over_budget=over_budget)
+        return response
+
+
+class _QueryCounter:
+    """execute_wrapper that counts queries and the time spent running them."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - start
@@ -0,0 +1,61 @@
+# Generated by Django 6.0 on 2026-10-17 18:14
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_usage_counters(apps, schema_editor):
+    Clinic = apps.get_model("clinics", "Clinic")
+    Patient = apps.get_model("patients", "Patient")
+    Visit = apps.get_model("visits", "Visit")
+    Attachment = apps.get_model("files", "Attachment")
+
+    patients = dict(Patient.objects.values_list("clinic").annotate(n=Count("pk")).order_by())
+    visits = dict(Visit.objects.values_list("clinic").annotate(n=Count("pk")).order_by())
+    attachments = {
+        row["clinic"]: row
+        for row in Attachment.objects.values("clinic").annotate(n=Count("pk"), size=Sum("file_size")).order_by()
+    }
+
+    for clinic_id in Clinic.objects.values_list("pk", flat=True):
+        files = attachments.get(clinic_id, {})
+        Clinic.objects.filter(pk=clinic_id).update(
+            patient_count=patients.get(clinic_id, 0),
+            visit_count=visits.get(clinic_id, 0),
+            attachment_count=files.get("n") or 0,
+            attachment_bytes=files.get("size") or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clinics", "0002_backfill_default_clinic"),
+        ("files", "0001_initial"),
+        ("patients", "0006_patient_search_indexes"),
+        ("visits", "0004_visit_patient_timeline_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clinic",
+            name="attachment_bytes",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="clinic",
+            name="attachment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="clinic",
+            name="patient_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="clinic",
+            name="visit_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_usage_counters, migrations.RunPython.noop),
+    ]
@@ -7,5 +7,24 @@ class Clinic(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Usage counters, maintained with F() updates by clinics.signals and
+    # repaired by `manage.py recount_clinic_stats`.
+    patient_count = models.PositiveIntegerField(default=0, editable=False)
+    visit_count = models.PositiveIntegerField(default=0, editable=False)
+    attachment_count = models.PositiveIntegerField(default=0, editable=False)
+    attachment_bytes = models.PositiveBigIntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = ("patient_count", "visit_count", "attachment_count", "attachment_bytes")
+
+    def save(self, *args, **kwargs):
+        # Never write back in-memory counter values: they may be stale and
+        # would overwrite concurrent F() increments.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
@@ -0,0 +1,186 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _json_default(value):
+    # Full precision: DjangoJSONEncoder truncates microseconds, which would
+    # make datetime keys skip or repeat rows.
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(direction, values):
+    payload = json.dumps({"d": direction, "k": list(values)}, default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        direction, values = payload["d"], payload["k"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+    if direction not in ("n", "p") or not isinstance(values, list):
+        raise InvalidCursor("Malformed cursor")
+    return direction, values
+
+
+class KeysetPaginator:
+    """
+    Keyset (cursor) pagination.
+
+    Pages are selected with a WHERE clause on the ordering key instead of
+    OFFSET, and no COUNT(*) is run, so every page costs the same however deep
+    it is. ``ordering`` must end with a unique column (usually "id"), may use
+    "-" for descending columns and must match an index to be efficient.
+    Key columns must not be NULL.
+
+    Usage:
+        paginator = KeysetPaginator(qs, 25, ordering=("normalized_name", "id"))
+        page = paginator.get_page(request.GET.get("cursor"))
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip("-") for field in self.ordering)
+        self.descending = tuple(field.startswith("-") for field in self.ordering)
+
+    def page(self, cursor=None):
+        """Return the page for ``cursor`` (None for the first page). Raise InvalidCursor."""
+        if not cursor:
+            return KeysetPage(self, "n", None)
+        direction, values = decode_cursor(cursor)
+        if len(values) != len(self.fields):
+            raise InvalidCursor("Cursor does not match the paginator ordering")
+        return KeysetPage(self, direction, values)
+
+    def get_page(self, cursor=None):
+        """Like page(), but fall back to the first page for a bad cursor."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+    def key_for(self, obj):
+        return [getattr(obj, "pk" if field == "pk" else field) for field in self.fields]
+
+    def _seek_filter(self, values, backwards):
+        """Rows strictly after ``values`` in ordering (or before when ``backwards``)."""
+        condition = Q()
+        for i, field in enumerate(self.fields):
+            ascending = not self.descending[i]
+            if backwards:
+                ascending = not ascending
+            term = Q(**{f"{field}__{'gt' if ascending else 'lt'}": values[i]})
+            for prev_field, prev_value in zip(self.fields[:i], values[:i]):
+                term &= Q(**{prev_field: prev_value})
+            condition |= term
+        return condition
+
+    def _fetch(self, direction, values):
+        backwards = direction == "p"
+        if backwards:
+            ordering = [field[1:] if field.startswith("-") else f"-{field}" for field in self.ordering]
+        else:
+            ordering = list(self.ordering)
+
+        qs = self.queryset.order_by(*ordering)
+        if values is not None:
+            qs = qs.filter(self._seek_filter(values, backwards))
+
+        rows = list(qs[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+        return rows, has_more
+
+
+class KeysetPage:
+    """
+    One page of a KeysetPaginator. Rows are fetched on first access, so an
+    unused page (e.g. inside a cached template fragment) costs no query.
+    """
+
+    def __init__(self, paginator, direction, values):
+        self.paginator = paginator
+        self.direction = direction
+        self.values = values
+        self._rows = None
+
+    @property
+    def cursor(self):
+        """
+        Canonical cursor of this page (None for the first page): the decoded
+        position re-encoded, so that unlike the raw request value it is safe
+        to use in cache keys.
+        """
+        if self.values is None:
+            return None
+        return encode_cursor(self.direction, self.values)
+
+    def _load(self):
+        if self._rows is None:
+            self._rows, has_more = self.paginator._fetch(self.direction, self.values)
+            if self.direction == "p":
+                self._has_previous, self._has_next = has_more, True
+            else:
+                self._has_previous, self._has_next = self.values is not None, has_more
+        return self._rows
+
+    @property
+    def object_list(self):
+        return self._load()
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __bool__(self):
+        return bool(self._load())
+
+    def has_next(self):
+        self._load()
+        return self._has_next
+
+    def has_previous(self):
+        self._load()
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        rows = self._load()
+        if not (self._has_next and rows):
+            return None
+        return encode_cursor("n", self.paginator.key_for(rows[-1]))
+
+    @property
+    def previous_cursor(self):
+        rows = self._load()
+        if not (self._has_previous and rows):
+            return None
+        return encode_cursor("p", self.paginator.key_for(rows[0]))
@@ -0,0 +1,154 @@
+"""
+Per-view performance counters and query budgets.
+
+clinics.middleware.PerfMiddleware measures every request: number of SQL
+queries, time spent in the database, total time and response size. Figures
+are aggregated in memory per view (URL name, e.g. "patients:detail") and
+written every PERF_FLUSH_INTERVAL seconds as a JSON snapshot per process
+under PERF_STATS_DIR, where `manage.py perf_report` and the admin JSON
+endpoint (clinics:perf) merge the snapshots of all workers.
+
+QUERY_BUDGETS maps URL names to the maximum number of queries a request may
+run. A request over budget is logged, or raises QueryBudgetExceeded when
+QUERY_BUDGET_ACTION is "raise" (used by the test suite, so that a new N+1
+fails the test instead of slowing production down).
+
+Queries run while a streaming response is being consumed are not counted.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("queries", "db_ms", "total_ms", "bytes")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class ViewStats:
+    """Running count, sum and maximum of each metric for one view."""
+
+    def __init__(self):
+        self.count = 0
+        self.over_budget = 0
+        self.sums = dict.fromkeys(METRICS, 0)
+        self.maxima = dict.fromkeys(METRICS, 0)
+
+    def add(self, values, over_budget=False):
+        self.count += 1
+        self.over_budget += over_budget
+        for metric in METRICS:
+            self.sums[metric] += values[metric]
+            self.maxima[metric] = max(self.maxima[metric], values[metric])
+
+    def as_dict(self):
+        return {"count": self.count, "over_budget": self.over_budget, "sum": dict(self.sums), "max": dict(self.maxima)}
+
+
+class PerfRecorder:
+    """In-process aggregate of ViewStats, periodically saved to PERF_STATS_DIR."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.views = {}
+        self.last_flush = time.monotonic()
+
+    def record(self, view_name, values, over_budget=False):
+        with self.lock:
+            self.views.setdefault(view_name, ViewStats()).add(values, over_budget)
+            due = time.monotonic() - self.last_flush >= settings.PERF_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {name: stats.as_dict() for name, stats in self.views.items()}
+
+    def flush(self):
+        """Write this process's totals to PERF_STATS_DIR/<pid>.json."""
+        directory = settings.PERF_STATS_DIR
+        # One writer at a time; other threads skip rather than wait
+        if not directory or not self.flush_lock.acquire(blocking=False):
+            return
+        try:
+            data = {"pid": os.getpid(), "written_at": time.time(), "views": self.snapshot()}
+            path = os.path.join(directory, f"{os.getpid()}.json")
+            os.makedirs(directory, exist_ok=True)
+            with open(path + ".tmp", "w") as fh:
+                json.dump(data, fh)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            logger.warning("Could not write performance snapshot to %s", directory, exc_info=True)
+        finally:
+            self.last_flush = time.monotonic()
+            self.flush_lock.release()
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+recorder = PerfRecorder()
+
+
+def query_budget(view_name):
+    return settings.QUERY_BUDGETS.get(view_name)
+
+
+def check_budget(view_name, queries):
+    """Return True if ``queries`` is over the view's budget (after logging or raising)."""
+    budget = query_budget(view_name)
+    if budget is None or queries <= budget:
+        return False
+    message = f"{view_name} ran {queries} queries (budget {budget})"
+    if settings.QUERY_BUDGET_ACTION == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+    return True
+
+
+def merge(snapshots):
+    """Combine per-process view snapshots into one {view: stats} dict with averages."""
+    merged = {}
+    for views in snapshots:
+        for name, stats in views.items():
+            total = merged.setdefault(name, {
+                "count": 0, "over_budget": 0, "sum": dict.fromkeys(METRICS, 0), "max": dict.fromkeys(METRICS, 0),
+            })
+            total["count"] += stats["count"]
+            total["over_budget"] += stats["over_budget"]
+            for metric in METRICS:
+                total["sum"][metric] += stats["sum"][metric]
+                total["max"][metric] = max(total["max"][metric], stats["max"][metric])
+    for name, total in merged.items():
+        total["avg"] = {metric: round(total["sum"][metric] / total["count"], 2) for metric in METRICS}
+        total["sum"] = {metric: round(value, 3) for metric, value in total["sum"].items()}
+        total["budget"] = query_budget(name)
+    return merged
+
+
+def collect():
+    """Merged stats of all processes (this one flushed first)."""
+    recorder.flush()
+    directory = settings.PERF_STATS_DIR
+    snapshots = []
+    if directory and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, name)) as fh:
+                    snapshots.append(json.load(fh)["views"])
+            except (OSError, ValueError, KeyError):
+                continue
+    else:
+        snapshots.append(recorder.snapshot())
+    return merge(snapshots)
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_patient_fragments
+from .stats import adjust_clinic_counters, invalidate_clinic_stats
+
+
+@receiver(post_save, sender="patients.Patient")
+def count_patient_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_clinic_counters(instance.clinic_id, patient_count=1)
+
+
+@receiver(post_delete, sender="patients.Patient")
+def count_patient_deleted(sender, instance, **kwargs):
+    adjust_clinic_counters(instance.clinic_id, patient_count=-1)
+
+
+@receiver(post_save, sender="visits.Visit")
+def count_visit_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_clinic_counters(instance.clinic_id, visit_count=1)
+
+
+@receiver(post_delete, sender="visits.Visit")
+def count_visit_deleted(sender, instance, **kwargs):
+    adjust_clinic_counters(instance.clinic_id, visit_count=-1)
+
+
+@receiver(post_save, sender="files.Attachment")
+def count_attachment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_clinic_counters(instance.clinic_id, attachment_count=1, attachment_bytes=instance.file_size or 0)
+
+
+@receiver(post_delete, sender="files.Attachment")
+def count_attachment_deleted(sender, instance, **kwargs):
+    adjust_clinic_counters(instance.clinic_id, attachment_count=-1, attachment_bytes=-(instance.file_size or 0))
+
+
+@receiver(post_save, sender="patients.Patient")
+@receiver(post_delete, sender="patients.Patient")
+@receiver(post_save, sender="visits.Visit")
+@receiver(post_delete, sender="visits.Visit")
+@receiver(post_save, sender="files.Attachment")
+@receiver(post_delete, sender="files.Attachment")
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def drop_clinic_stats(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_clinic_stats(instance.clinic_id)
+
+
+@receiver(post_save, sender="visits.Visit")
+@receiver(post_delete, sender="visits.Visit")
+def drop_patient_visit_fragments(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Attachments show the date of their visit
+    bump_patient_fragments([instance.patient_id], "visits", "attachments")
+
+
+@receiver(post_save, sender="files.Attachment")
+@receiver(post_delete, sender="files.Attachment")
+def drop_patient_attachment_fragments(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_patient_fragments([instance.patient_id], "attachments")
+
+
+# Audit events are append-only, and a post_delete receiver would stop
+# purge_events from deleting them in bulk (Django fetches rows to send it)
+@receiver(post_save, sender="audit.AuditEvent")
+def drop_patient_audit_fragments(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_patient_fragments([instance.patient_id], "audit")
@@ -0,0 +1,153 @@
+"""
+Per-clinic usage counters and statistics for the admin dashboard.
+
+Totals are read from the counter columns on Clinic, which are adjusted with
+F() updates on every create/delete (see clinics.signals) and can be rebuilt
+with recount_clinic_counters(). The remaining figures are computed in the
+same query (scalar subqueries on the clinic row) and cached per clinic. The
+handlers in clinics.signals drop the cached entry whenever a Patient, Visit,
+Attachment or User of the clinic is saved or deleted, so a dashboard load is
+normally one cache read. The timeout bounds how stale the "last 30 days"
+figures can get, since that window moves even without writes.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+STATS_CACHE_TIMEOUT = 5 * 60  # seconds
+RECENT_DAYS = 30
+
+
+def stats_cache_key(clinic_id):
+    return f"clinic_stats:{clinic_id}"
+
+
+def _count(queryset):
+    """Scalar COUNT subquery over ``queryset`` correlated on the outer clinic row."""
+    counted = (
+        queryset
+        .filter(clinic=OuterRef("pk"))
+        .order_by()
+        .values("clinic")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counted[:1]), 0)
+
+
+def compute_clinic_stats(clinic_id):
+    from accounts.models import User
+    from patients.models import Patient
+    from visits.models import Visit
+    from .models import Clinic
+
+    since = timezone.now() - timedelta(days=RECENT_DAYS)
+    roles = [role for role, _label in User.ROLE_CHOICES]
+
+    row = (
+        Clinic.objects
+        .filter(pk=clinic_id)
+        .annotate(
+            total_patients=F("patient_count"),
+            total_visits=F("visit_count"),
+            total_files=F("attachment_count"),
+            recent_patients=_count(Patient.objects.filter(created_at__gte=since)),
+            recent_visits=_count(Visit.objects.filter(visit_datetime__gte=since)),
+            total_users=_count(User.objects.all()),
+            **{f"users_{role}": _count(User.objects.filter(role=role)) for role in roles},
+        )
+        .values(
+            "total_patients", "total_visits", "total_files", "recent_patients", "recent_visits",
+            "total_users", *(f"users_{role}" for role in roles),
+        )
+        .first()
+    ) or {}
+
+    return {
+        "total_patients": row.get("total_patients", 0),
+        "total_visits": row.get("total_visits", 0),
+        "total_files": row.get("total_files", 0),
+        "recent_patients": row.get("recent_patients", 0),
+        "recent_visits": row.get("recent_visits", 0),
+        "total_users": row.get("total_users", 0),
+        # Same shape as values("role").annotate(count=...): only roles in use
+        "users_by_role": [
+            {"role": role, "count": row[f"users_{role}"]}
+            for role in roles
+            if row.get(f"users_{role}")
+        ],
+    }
+
+
+def get_clinic_stats(clinic):
+    clinic_id = getattr(clinic, "pk", clinic)
+    key = stats_cache_key(clinic_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_clinic_stats(clinic_id)
+        cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def invalidate_clinic_stats(clinic_id):
+    if clinic_id is not None:
+        cache.delete(stats_cache_key(clinic_id))
+
+
+def adjust_clinic_counters(clinic_id, **deltas):
+    """
+    Atomically add ``deltas`` to the clinic's counter columns, e.g.
+    adjust_clinic_counters(clinic.pk, patient_count=1). Never goes below zero.
+    """
+    from .models import Clinic
+
+    updates = {field: Greatest(F(field) + delta, 0) for field, delta in deltas.items() if delta}
+    if clinic_id is not None and updates:
+        Clinic.objects.filter(pk=clinic_id).update(**updates)
+
+
+def recount_clinic_counters(clinic_ids=None):
+    """
+    Recompute the counter columns from the source tables.
+
+    Returns {clinic_id: {field: (old, new)}} for every counter that drifted.
+    """
+    from files.models import Attachment
+    from patients.models import Patient
+    from visits.models import Visit
+    from .models import Clinic
+
+    def grouped(queryset, **aggregates):
+        if clinic_ids is not None:
+            queryset = queryset.filter(clinic_id__in=clinic_ids)
+        return {row.pop("clinic"): row for row in queryset.values("clinic").annotate(**aggregates).order_by()}
+
+    patients = grouped(Patient.objects.all(), n=Count("pk"))
+    visits = grouped(Visit.objects.all(), n=Count("pk"))
+    attachments = grouped(Attachment.objects.all(), n=Count("pk"), size=Sum("file_size"))
+
+    clinics = Clinic.objects.only("pk", *Clinic.COUNTER_FIELDS).order_by("pk")
+    if clinic_ids is not None:
+        clinics = clinics.filter(pk__in=clinic_ids)
+
+    drift = {}
+    for clinic in clinics:
+        actual = {
+            "patient_count": patients.get(clinic.pk, {}).get("n", 0),
+            "visit_count": visits.get(clinic.pk, {}).get("n", 0),
+            "attachment_count": attachments.get(clinic.pk, {}).get("n", 0),
+            "attachment_bytes": attachments.get(clinic.pk, {}).get("size") or 0,
+        }
+        changed = {
+            field: (getattr(clinic, field), value)
+            for field, value in actual.items()
+            if getattr(clinic, field) != value
+        }
+        if changed:
+            Clinic.objects.filter(pk=clinic.pk).update(**actual)
+            invalidate_clinic_stats(clinic.pk)
+            drift[clinic.pk] = changed
+    return drift
@@ -0,0 +1,197 @@
+"""
+Synthetic clinic data for tests and local benchmarks.
+
+seed_clinic() fills a clinic with patients (Egyptian names, phone numbers in
+the formats patients.normalization handles, 14-digit national IDs), visits,
+attachments and audit events, using bulk_create in batches. Output is
+deterministic for a given ``seed``. All attachments of a clinic share one
+small dummy PDF blob, so seeding writes a single file whatever the volume.
+"""
+import datetime
+import hashlib
+import random
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from audit.models import AuditEvent
+from files.models import Attachment
+from files.storage import blob_name
+from patients.models import Patient
+from visits.models import Visit
+from .stats import adjust_clinic_counters, invalidate_clinic_stats
+
+FIRST_NAMES = (
+    "Ahmed", "Mohamed", "Mahmoud", "Mostafa", "Omar", "Youssef", "Khaled", "Hassan", "Ibrahim", "Karim",
+    "Amr", "Tarek", "Sherif", "Hany", "Walid", "Fatma", "Aya", "Mariam", "Nour", "Salma",
+    "Yasmin", "Heba", "Mona", "Rana", "Dina", "Eman", "Asmaa", "Shaimaa", "Reem", "Hoda",
+)
+FAMILY_NAMES = (
+    "Hassan", "Ali", "Ibrahim", "Abdelrahman", "El-Sayed", "Mahmoud", "Farouk", "Soliman", "Nasser", "Fathy",
+    "Mansour", "Abdallah", "Gomaa", "Shaker", "El-Masry", "Saad", "Hamdy", "Zaki", "Youssef", "Ramadan",
+)
+MOBILE_PREFIXES = ("010", "011", "012", "015")
+COMPLAINTS = (
+    "Fever", "Headache", "Cough", "Abdominal pain", "Back pain", "Follow-up", "Chest pain",
+    "Skin rash", "Sore throat", "Hypertension follow-up", "Diabetes follow-up", "Dizziness",
+)
+DIAGNOSES = (
+    "Upper respiratory tract infection", "Gastritis", "Tension headache", "Hypertension",
+    "Type 2 diabetes", "Lumbar strain", "Allergic dermatitis", "Tonsillitis", "",
+)
+PATIENT_ID_SAMPLE = 100  # patient pks returned by seed_clinic()
+AUDIT_ACTIONS = (AuditEvent.Action.PATIENT_VIEWED, AuditEvent.Action.FILE_DOWNLOADED, AuditEvent.Action.VISIT_EDITED)
+DUMMY_PDF = b"%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\ntrailer << /Root 1 0 R >>\n%%EOF\n"
+
+
+def egyptian_phone(index, rng):
+    """Unique mobile number for ``index``, written in one of the common formats."""
+    prefix = MOBILE_PREFIXES[index % len(MOBILE_PREFIXES)]
+    number = f"{prefix}{index // len(MOBILE_PREFIXES):08d}"
+    style = rng.random()
+    if style < 0.5:
+        return number
+    if style < 0.7:
+        return f"+20{number[1:]}"
+    if style < 0.85:
+        return f"20{number[1:]}"
+    return f"{number[:4]} {number[4:7]} {number[7:]}"
+
+
+def national_id(index, rng):
+    """
+    Unique 14-digit national ID for ``index`` (century, birth date, governorate,
+    sequence, check digit) and the birth date it encodes.
+    """
+    # 7919 is prime to the 29200-day range, so (birth date, sequence) repeats only every 730000 indexes
+    born = datetime.date(1940, 1, 1) + datetime.timedelta(days=index * 7919 % (80 * 365))
+    century = 2 if born.year < 2000 else 3
+    return f"{century}{born:%y%m%d}{rng.randrange(1, 36):02d}{index % 10000:04d}{rng.randrange(10)}", born
+
+
+def _patient(clinic, index, rng, now):
+    nid, born = national_id(index, rng)
+    return Patient(
+        clinic=clinic,
+        full_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(FAMILY_NAMES)}",
+        phone=egyptian_phone(index, rng),
+        national_id=nid,
+        sex=rng.choice("MF"),
+        date_of_birth=born,
+        created_at=now - datetime.timedelta(days=rng.randrange(3 * 365)),
+    )
+
+
+def _batches(objs, size):
+    for start in range(0, len(objs), size):
+        yield objs[start:start + size]
+
+
+def dummy_blob(clinic):
+    """Storage name of the clinic's shared dummy PDF (written on first use)."""
+    sha256 = hashlib.sha256(DUMMY_PDF).hexdigest()
+    name = blob_name(clinic.pk, sha256)
+    storage = Attachment._meta.get_field("file").storage
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(DUMMY_PDF))
+    return name, sha256
+
+
+def seed_clinic(clinic, *, patients=100, visits_per_patient=3, attachments_per_patient=1,
+                audit_events_per_patient=2, doctors=(), batch_size=1000, seed=0, start_index=0):
+    """
+    Add synthetic data to ``clinic``. ``doctors`` (users of the clinic) are
+    assigned to visits and used as audit actors. ``start_index`` offsets the
+    generated phone numbers and IDs so repeated calls do not collide.
+    Works through ``batch_size`` patients per transaction, so memory use does
+    not grow with the volume. Returns {"patients": n, "visits": n,
+    "attachments": n, "audit_events": n, "patient_ids": [...]}, where
+    patient_ids holds the pks of the first PATIENT_ID_SAMPLE patients.
+    """
+    rng = random.Random(seed)
+    doctors = list(doctors)
+    totals = {"patients": 0, "visits": 0, "attachments": 0, "audit_events": 0, "patient_ids": []}
+    blob = dummy_blob(clinic) if attachments_per_patient else None
+
+    end = start_index + patients
+    for first in range(start_index, end, batch_size):
+        with transaction.atomic():
+            _seed_batch(
+                clinic, range(first, min(first + batch_size, end)), totals, rng, doctors, blob,
+                visits_per_patient, attachments_per_patient, audit_events_per_patient, batch_size,
+            )
+
+    invalidate_clinic_stats(clinic.pk)
+    return totals
+
+
+def _seed_batch(clinic, indexes, totals, rng, doctors, blob, visits_per_patient, attachments_per_patient,
+                audit_events_per_patient, batch_size):
+    now = timezone.now()
+    created = Patient.objects.bulk_create([_patient(clinic, index, rng, now) for index in indexes])
+    totals["patients"] += len(created)
+    totals["patient_ids"].extend(patient.pk for patient in created[:PATIENT_ID_SAMPLE - len(totals["patient_ids"])])
+
+    visits_by_patient = {}
+    visits = [
+        Visit(
+            patient=patient,
+            doctor=rng.choice(doctors) if doctors else None,
+            visit_datetime=now - datetime.timedelta(days=rng.randrange(3 * 365), minutes=rng.randrange(600)),
+            chief_complaint=rng.choice(COMPLAINTS),
+            clinical_notes="Synthetic visit. " * rng.randrange(1, 20),
+            diagnosis=rng.choice(DIAGNOSES),
+        )
+        for patient in created
+        for _ in range(visits_per_patient)
+    ]
+    for chunk in _batches(visits, batch_size):
+        for visit in Visit.objects.bulk_create(chunk):
+            visits_by_patient.setdefault(visit.patient_id, []).append(visit)
+    totals["visits"] += len(visits)
+
+    if blob:
+        file_name, sha256 = blob
+        attachments = [
+            Attachment(
+                clinic=clinic,
+                patient=patient,
+                visit=rng.choice(visits_by_patient[patient.pk]) if patient.pk in visits_by_patient else None,
+                uploaded_by=rng.choice(doctors) if doctors else None,
+                file=file_name,
+                original_filename=f"lab-{n + 1}.pdf",
+                file_type=Attachment.FileType.LAB_RESULT,
+                file_size=len(DUMMY_PDF),
+                mime_type="application/pdf",
+                sha256=sha256,
+                uploaded_at=now - datetime.timedelta(days=rng.randrange(3 * 365)),
+            )
+            for patient in created
+            for n in range(attachments_per_patient)
+        ]
+        for chunk in _batches(attachments, batch_size):
+            Attachment.objects.bulk_create(chunk)
+        # Attachment.objects.bulk_create sends no post_save: keep the counters in step
+        adjust_clinic_counters(
+            clinic.pk, attachment_count=len(attachments), attachment_bytes=len(attachments) * len(DUMMY_PDF)
+        )
+        totals["attachments"] += len(attachments)
+
+    events = [
+        AuditEvent(
+            clinic=clinic,
+            actor=rng.choice(doctors) if doctors else None,
+            action=rng.choice(AUDIT_ACTIONS),
+            object_type="patients.Patient",
+            object_id=patient.pk,
+            patient_id=patient.pk,
+            ip_address=f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+            created_at=now - datetime.timedelta(minutes=rng.randrange(365 * 24 * 60)),
+        )
+        for patient in created
+        for _ in range(audit_events_per_patient)
+    ]
+    for chunk in _batches(events, batch_size):
+        AuditEvent.objects.bulk_create(chunk)
+    totals["audit_events"] += len(events)
@@ -0,0 +1,86 @@
+"""
+Fixtures for the query-count tests (clinics/tests.py).
+
+QueryCountTestCase seeds two clinics with the same shape but very different
+volumes (clinics.synthetic) and runs with QUERY_BUDGET_ACTION="raise", so a
+view over its QUERY_BUDGETS entry fails too. Tests assert the same exact
+query count in both clinics: a count that grows with the data is an N+1.
+Seeding the large clinic takes seconds, so keep these tests in a single
+subclass: setUpTestData runs once per class.
+"""
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from patients.models import Patient
+from .models import Clinic
+from .synthetic import seed_clinic
+
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), "clinic-records-tests")
+
+
+class SeededClinic:
+    """A clinic with one user per role and one heavily used patient."""
+
+    def __init__(self, name, patients, busy_visits, busy_attachments, busy_audit_events, start_index):
+        self.clinic = Clinic.objects.create(name=name)
+        self.users = {
+            role: User.objects.create_user(f"{role}-{name.lower()}", password="x", role=role, clinic=self.clinic)
+            for role in ("admin", "doctor", "assistant")
+        }
+        doctors = [self.users["doctor"], self.users["admin"]]
+        seed_clinic(
+            self.clinic, patients=patients, visits_per_patient=3, attachments_per_patient=1,
+            audit_events_per_patient=2, doctors=doctors, start_index=start_index,
+        )
+        busy = seed_clinic(
+            self.clinic, patients=1, visits_per_patient=busy_visits, attachments_per_patient=busy_attachments,
+            audit_events_per_patient=busy_audit_events, doctors=doctors, start_index=start_index + patients,
+        )
+        self.busy_patient = Patient.objects.get(pk=busy["patient_ids"][0])
+        self.visit = self.busy_patient.visits.order_by("pk").first()
+        self.attachment = self.busy_patient.attachments.order_by("pk").first()
+
+
+# The test process is the only one using its local-memory cache, so fragment
+# caching is safe to turn on and counted as in production
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT, QUERY_BUDGET_ACTION="raise", PERF_STATS_DIR="", PATIENT_FRAGMENT_CACHE_TIMEOUT=3600,
+)
+class QueryCountTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = SeededClinic(
+            "Small", patients=3, busy_visits=2, busy_attachments=1, busy_audit_events=2, start_index=0,
+        )
+        cls.large = SeededClinic(
+            "Large", patients=3000, busy_visits=120, busy_attachments=60, busy_audit_events=400,
+            start_index=10000,
+        )
+        cls.clinics = (cls.small, cls.large)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def login(self, user):
+        # Start from a cold cache so counts include filling the cached fragments and stats
+        cache.clear()
+        self.client.force_login(user)
+
+    def assertQueriesPerClinic(self, count, role, url_for, status=200):
+        """GET url_for(seeded_clinic) as ``role`` in each clinic with exactly ``count`` queries."""
+        for seeded in self.clinics:
+            with self.subTest(clinic=seeded.clinic.name):
+                url = url_for(seeded)
+                self.login(seeded.users[role])
+                with self.assertNumQueries(count):
+                    response = self.client.get(url)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                self.assertEqual(response.status_code, status)
@@ -1,3 +1,185 @@
-from django.test import TestCase
+"""
+Query-count regression tests of the main views (see clinics.testing), and
+tests of the clinic views.
 
-# Create your tests here.
+The query-count tests all live in one class so that the large clinic is
+seeded once per run.
+"""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+
+from clinics.caching import fragment_version_key
+from clinics.pagination import KeysetPaginator
+from patients.models import Patient
+from visits.models import Visit
+from .models import Clinic
+from .testing import QueryCountTestCase
+
+
+# Every request: 1 query loads the session user with their clinic (accounts.backends)
+class MainViewQueryTests(QueryCountTestCase):
+    # Patients
+    def test_patient_list(self):
+        # user + page
+        self.assertQueriesPerClinic(2, "assistant", lambda seeded: reverse("patients:list"))
+
+    def test_patient_list_later_page(self):
+        def url(seeded):
+            patients = Patient.objects.for_clinic(seeded.clinic)
+            page = KeysetPaginator(patients, 1, ordering=("normalized_name", "id")).page()
+            return reverse("patients:list") + f"?cursor={page.next_cursor}"
+
+        self.assertQueriesPerClinic(2, "assistant", url)
+
+    def test_patient_list_search(self):
+        self.assertQueriesPerClinic(2, "assistant", lambda seeded: reverse("patients:list") + "?q=ahmed")
+
+    def test_patient_detail(self):
+        # user, patient, visits page, patient_viewed audit insert, audit trail, attachments
+        self.assertQueriesPerClinic(
+            6, "doctor", lambda seeded: reverse("patients:detail", args=[seeded.busy_patient.pk])
+        )
+
+    def test_patient_detail_as_assistant(self):
+        # No audit trail for assistants
+        self.assertQueriesPerClinic(
+            5, "assistant", lambda seeded: reverse("patients:detail", args=[seeded.busy_patient.pk])
+        )
+
+    def test_admin_dashboard(self):
+        # user, clinic stats, users, recent audit events
+        self.assertQueriesPerClinic(4, "admin", lambda seeded: reverse("patients:admin_dashboard"))
+
+    def test_patient_detail_repeat_view(self):
+        # visits/attachments/audit come from the cache: user and patient only
+        for seeded in self.clinics:
+            with self.subTest(clinic=seeded.clinic.name):
+                url = reverse("patients:detail", args=[seeded.busy_patient.pk])
+                self.login(seeded.users["doctor"])
+                self.client.get(url)
+                with self.assertNumQueries(2):
+                    response = self.client.get(url)
+                self.assertContains(response, reverse("files:delete", args=[seeded.attachment.pk]))
+
+    @override_settings(PATIENT_FRAGMENT_CACHE_TIMEOUT=0)
+    def test_patient_detail_uncached(self):
+        # Default with a per-process cache: every section is rendered again
+        seeded = self.small
+        url = reverse("patients:detail", args=[seeded.busy_patient.pk])
+        self.login(seeded.users["doctor"])
+        self.client.get(url)
+        # user, patient, visits page, audit trail, attachments
+        with self.assertNumQueries(5):
+            self.client.get(url)
+        self.assertFalse(cache.get(fragment_version_key(seeded.busy_patient.pk, "visits")))
+
+    def test_patient_detail_invalid_cursor_reuses_first_page(self):
+        # An invalid ?visits= falls back to the first page and its cache entry
+        seeded = self.large
+        url = reverse("patients:detail", args=[seeded.busy_patient.pk])
+        self.login(seeded.users["doctor"])
+        self.client.get(url)
+        for junk in ("garbage", "eyJkIjoibiJ9", "a" * 500):
+            with self.subTest(cursor=junk), self.assertNumQueries(2):
+                self.client.get(url, {"visits": junk})
+
+    def test_patient_detail_cache_follows_changes(self):
+        seeded = self.small
+        url = reverse("patients:detail", args=[seeded.busy_patient.pk])
+        self.login(seeded.users["doctor"])
+        self.client.get(url)
+
+        Visit.objects.create(patient=seeded.busy_patient, chief_complaint="Sprained ankle")
+        seeded.attachment.title = "Renamed scan"
+        seeded.attachment.save()
+        response = self.client.get(url)
+        self.assertContains(response, "Sprained ankle")
+        self.assertContains(response, "Renamed scan")
+
+        download_url = reverse("files:download", args=[seeded.attachment.pk])
+        seeded.attachment.delete()
+        self.assertNotContains(self.client.get(url), download_url)
+
+    def test_patient_detail_cache_is_per_role(self):
+        seeded = self.small
+        url = reverse("patients:detail", args=[seeded.busy_patient.pk])
+        self.login(seeded.users["doctor"])
+        self.assertContains(self.client.get(url), reverse("files:delete", args=[seeded.attachment.pk]))
+
+        # Same versions, but the assistant must not get the doctor's buttons
+        self.client.force_login(seeded.users["assistant"])
+        response = self.client.get(url)
+        self.assertContains(response, reverse("files:download", args=[seeded.attachment.pk]))
+        self.assertNotContains(response, reverse("files:delete", args=[seeded.attachment.pk]))
+        self.assertNotContains(response, reverse("visits:edit", args=[seeded.visit.pk]))
+
+    # Visits
+    def test_visit_edit(self):
+        # user, visit with its patient
+        self.assertQueriesPerClinic(2, "doctor", lambda seeded: reverse("visits:edit", args=[seeded.visit.pk]))
+
+    def test_visit_edit_post(self):
+        for seeded in self.clinics:
+            with self.subTest(clinic=seeded.clinic.name):
+                self.login(seeded.users["doctor"])
+                url = reverse("visits:edit", args=[seeded.visit.pk])
+                data = {
+                    "visit_datetime": "2026-01-15 10:30",
+                    "chief_complaint": "Follow-up",
+                    "clinical_notes": "Better.",
+                }
+                # user, visit with its patient, update, visit_edited audit insert
+                with self.assertNumQueries(4):
+                    response = self.client.post(url, data)
+                self.assertRedirects(
+                    response, reverse("patients:detail", args=[seeded.visit.patient_id]), fetch_redirect_response=False
+                )
+
+    # Attachments
+    def test_attachment_download(self):
+        # user, attachment, file_downloaded audit insert
+        self.assertQueriesPerClinic(
+            3, "doctor", lambda seeded: reverse("files:download", args=[seeded.attachment.pk])
+        )
+
+    # Users
+    def test_user_list(self):
+        # user, page of users
+        self.assertQueriesPerClinic(2, "admin", lambda seeded: reverse("accounts:list"))
+
+    # Audit search
+    def test_audit_search(self):
+        # user, actor choices, page of events
+        self.assertQueriesPerClinic(3, "admin", lambda seeded: reverse("audit:search"))
+
+    def test_audit_search_by_patient(self):
+        self.assertQueriesPerClinic(
+            3, "admin", lambda seeded: reverse("audit:search") + f"?patient_id={seeded.busy_patient.pk}"
+        )
+
+    def test_audit_search_json(self):
+        # user, page of events (no form rendering)
+        self.assertQueriesPerClinic(
+            2, "admin", lambda seeded: reverse("audit:search_json") + f"?patient_id={seeded.busy_patient.pk}"
+        )
+
+
+class ClinicExportTests(TestCase):
+    def setUp(self):
+        clinic = Clinic.objects.create(name="Export")
+        self.client.force_login(User.objects.create_user("admin-export", password="x", role="admin", clinic=clinic))
+
+    def test_since_accepts_dates_and_datetimes(self):
+        for since in ("2026-01-01", "2026-01-01T08:30:00", "2026-01-01T08:30:00+02:00"):
+            with self.subTest(since=since):
+                response = self.client.get(reverse("clinics:export"), {"since": since})
+                self.assertEqual(response.status_code, 200)
+                b"".join(response.streaming_content)
+
+    def test_invalid_since(self):
+        for since in ("yesterday", "2026-13-01", "2026-02-30T10:00:00"):
+            with self.subTest(since=since):
+                self.assertEqual(self.client.get(reverse("clinics:export"), {"since": since}).status_code, 400)
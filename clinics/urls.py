@@ -5,4 +5,6 @@ app_name = "clinics"
 
 urlpatterns = [
     path("settings/", views.clinic_settings, name="settings"),
+    path("export/", views.clinic_export, name="export"),
+    path("perf/", views.perf_stats, name="perf"),
 ]
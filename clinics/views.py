@@ -1,10 +1,15 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
+from django.utils import timezone
 
 from accounts.permissions import role_required
 from audit.models import AuditEvent
 from audit.utils import log_event
+from . import perf
+from .dates import parse_date_or_datetime
+from .export import FORMATS, stream_export
 from .forms import ClinicSettingsForm
 
 
@@ -33,3 +38,47 @@ def clinic_settings(request):
         form = ClinicSettingsForm(instance=clinic)
 
     return render(request, "clinics/settings.html", {"form": form, "clinic": clinic})
+
+
+@login_required
+@role_required("admin")
+def clinic_export(request):
+    """
+    Stream a zip export of the clinic's data (see clinics.export).
+    ?format=ndjson|csv, ?since=<date or ISO datetime> for an incremental export,
+    ?files=1 to include the attachment files.
+    """
+    clinic = request.clinic
+    fmt = request.GET.get("format", "ndjson")
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest("Unknown format")
+
+    since = None
+    if request.GET.get("since"):
+        try:
+            since = parse_date_or_datetime(request.GET["since"])
+        except ValueError:
+            return HttpResponseBadRequest("Invalid since")
+    include_files = request.GET.get("files") == "1"
+
+    log_event(
+        request,
+        action=AuditEvent.Action.CLINIC_EXPORTED,
+        obj=clinic,
+        metadata={"format": fmt, "since": since.isoformat() if since else None, "files": include_files},
+    )
+
+    response = StreamingHttpResponse(
+        stream_export(clinic, fmt=fmt, since=since, include_files=include_files),
+        content_type="application/zip",
+    )
+    filename = f"clinic-{clinic.pk}-export-{timezone.localdate():%Y%m%d}.zip"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@role_required("admin")
+def perf_stats(request):
+    """Per-view performance figures of all processes as JSON (see clinics.perf)."""
+    return JsonResponse({"views": perf.collect()})
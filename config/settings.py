@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -60,6 +61,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "clinics.middleware.PerfMiddleware",
     "clinics.middleware.ClinicMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -137,10 +139,147 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
+# Browser (private) cache lifetime for downloaded attachments, in seconds.
+# Revalidation after expiry is a cheap 304 thanks to ETag / Last-Modified.
+ATTACHMENT_CACHE_MAX_AGE = int(os.environ.get("ATTACHMENT_CACHE_MAX_AGE", "3600"))
+
+# Layout of newly uploaded attachments (see files/storage.py):
+#   "path"    – clinic_X/patient_Y/<filename>, one file per attachment (default)
+#   "content" – clinic_X/blobs/ab/<sha256>, identical uploads within a
+#               clinic share one reference-counted file
+ATTACHMENT_STORAGE_MODE = os.environ.get("ATTACHMENT_STORAGE_MODE", "path")
+
+# Django's default upload handlers, extended to hash (SHA-256) and sniff the
+# magic bytes of each file while it is spooled (files/uploadhandlers.py).
+FILE_UPLOAD_HANDLERS = [
+    "files.uploadhandlers.DigestingMemoryFileUploadHandler",
+    "files.uploadhandlers.DigestingTemporaryFileUploadHandler",
+]
+
+# Chunked, resumable uploads (files/chunked.py) for files above the 10MB form
+# limit. Part files are written to ATTACHMENT_UPLOAD_TEMP_DIR, which must be
+# shared by all workers (defaults to <tmp>/clinic-uploads); sessions idle for
+# longer than the TTL (seconds) are removed by `manage.py purge_upload_sessions`.
+ATTACHMENT_UPLOAD_CHUNK_SIZE = int(os.environ.get("ATTACHMENT_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+ATTACHMENT_UPLOAD_MAX_SIZE = int(os.environ.get("ATTACHMENT_UPLOAD_MAX_SIZE", str(1024 * 1024 * 1024)))
+ATTACHMENT_UPLOAD_TEMP_DIR = os.environ.get("ATTACHMENT_UPLOAD_TEMP_DIR", "")
+ATTACHMENT_UPLOAD_SESSION_TTL = int(os.environ.get("ATTACHMENT_UPLOAD_SESSION_TTL", str(24 * 3600)))
+
+# Image attachment previews: bounding box in pixels (2x the 150px preview for
+# high-DPI screens) and browser (private) cache lifetime in seconds. A
+# thumbnail never changes for a given attachment, so it can be cached long.
+ATTACHMENT_THUMBNAIL_SIZE = int(os.environ.get("ATTACHMENT_THUMBNAIL_SIZE", "320"))
+ATTACHMENT_THUMBNAIL_MAX_AGE = int(os.environ.get("ATTACHMENT_THUMBNAIL_MAX_AGE", str(30 * 24 * 3600)))
+
+# How attachment bodies are sent once Django has authorized and audited the
+# download:
+#   "django"   – streamed by the worker (default, works everywhere)
+#   "nginx"    – X-Accel-Redirect to ATTACHMENT_ACCEL_REDIRECT_PREFIX, e.g.
+#                location /protected-media/ { internal; alias /path/to/media/; etag off; }
+#   "sendfile" – X-Sendfile with the absolute path (Apache mod_xsendfile, lighttpd)
+ATTACHMENT_SERVE_BACKEND = os.environ.get("ATTACHMENT_SERVE_BACKEND", "django")
+ATTACHMENT_ACCEL_REDIRECT_PREFIX = os.environ.get("ATTACHMENT_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
 
 AUTH_USER_MODEL = 'accounts.User'
 
 
+# ── Cache ────────────────────────────────────────────────────────────────────
+# Local-memory (per process) by default. In production point CACHE_BACKEND at a
+# cache shared by all workers (e.g. django.core.cache.backends.redis.RedisCache)
+# so that invalidations reach every process.
+# Patient page fragment caching needs such a shared cache: with local memory an
+# invalidation only reaches the worker that made the change, so it is off
+# (timeout 0) unless CACHE_BACKEND is changed.
+# -----------------------------------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+_SHARED_CACHE = CACHES["default"]["BACKEND"] != "django.core.cache.backends.locmem.LocMemCache"
+
+# The patient page caches its visit history, attachment grid and audit table
+# (see clinics.caching). Saves and deletes invalidate them at once; the timeout
+# only bounds changes that send no signal, such as a renamed user or audit
+# events purged by archive_audit_events. Only set it with local memory when a
+# single process serves the site.
+PATIENT_FRAGMENT_CACHE_TIMEOUT = int(
+    os.environ.get("PATIENT_FRAGMENT_CACHE_TIMEOUT", "3600" if _SHARED_CACHE else "0")
+)
+
+
+# ── Sessions & authentication ────────────────────────────────────────────────
+# cached_db reads sessions from the cache and falls back to the database, so a
+# session survives cache restarts. The default local-memory cache is only
+# correct with a single process (a logout or user change would not reach other
+# workers); otherwise use a shared cache (see CACHES), or on a single host
+# CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache with
+# CACHE_LOCATION=/var/tmp/clinic-cache.
+# The auth backend loads the user with their clinic in one query per request;
+# users are never cached across requests, so role, password and is_active
+# changes apply at once in every worker.
+# -----------------------------------------------------------------------------
+SESSION_ENGINE = os.environ.get("SESSION_ENGINE", "django.contrib.sessions.backends.cached_db")
+AUTHENTICATION_BACKENDS = ["accounts.backends.ClinicModelBackend"]
+
+
+# ── Audit log ────────────────────────────────────────────────────────────────
+# "sync" writes each audit event inside the request (default, used by tests).
+# "buffered" queues events in-process and bulk-inserts them from a background
+# thread every AUDIT_BATCH_SIZE events or AUDIT_FLUSH_INTERVAL seconds; the
+# queue is flushed on normal process exit.
+# -----------------------------------------------------------------------------
+AUDIT_WRITE_MODE     = os.environ.get("AUDIT_WRITE_MODE", "sync")
+AUDIT_BATCH_SIZE     = int(os.environ.get("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", "2.0"))
+
+# PATIENT_VIEWED is logged at most once per user and patient in this window
+# (audit.throttle; the marker is kept in the cache, not the session).
+AUDIT_VIEW_THROTTLE_SECONDS = int(os.environ.get("AUDIT_VIEW_THROTTLE_SECONDS", "600"))
+
+# Retention: `manage.py archive_audit_events` (run e.g. nightly) moves events
+# older than AUDIT_RETENTION_MONTHS full months into gzip NDJSON files under
+# AUDIT_ARCHIVE_DIR and removes them from the database; the archive is
+# searchable with `manage.py search_audit_archive`.
+AUDIT_RETENTION_MONTHS = int(os.environ.get("AUDIT_RETENTION_MONTHS", "24"))
+AUDIT_ARCHIVE_DIR      = os.environ.get("AUDIT_ARCHIVE_DIR", str(BASE_DIR / "audit_archive"))
+
+
+# ── Performance instrumentation ──────────────────────────────────────────────
+# clinics.middleware.PerfMiddleware counts queries, DB time, total time and
+# response bytes per view; each process saves its totals every
+# PERF_FLUSH_INTERVAL seconds under PERF_STATS_DIR for `manage.py perf_report`
+# and /clinic/perf/. QUERY_BUDGETS caps the queries per request by URL name;
+# QUERY_BUDGET_ACTION "log" warns on overruns, "raise" fails the request (tests).
+# -----------------------------------------------------------------------------
+PERF_INSTRUMENTATION = os.environ.get("PERF_INSTRUMENTATION", "True") == "True"
+PERF_STATS_DIR       = os.environ.get("PERF_STATS_DIR", os.path.join(tempfile.gettempdir(), "clinic-records-perf"))
+PERF_FLUSH_INTERVAL  = float(os.environ.get("PERF_FLUSH_INTERVAL", "10"))
+QUERY_BUDGET_ACTION  = os.environ.get("QUERY_BUDGET_ACTION", "log")
+QUERY_BUDGETS = {
+    "patients:list": 5,
+    "patients:detail": 10,
+    "patients:admin_dashboard": 6,
+    "visits:edit": 7,
+    "files:download": 5,
+    "accounts:list": 4,
+    "audit:search": 5,
+    "audit:search_json": 5,
+}
+
+
+# ── Patient search ───────────────────────────────────────────────────────────
+# Dotted path to the engine behind the patient list search box. Leave empty to
+# use the engine matching the database (pg_trgm on PostgreSQL, FTS5 on SQLite).
+# Available: patients.search.TrigramSearchBackend,
+#            patients.search.SQLiteFTSSearchBackend,
+#            patients.search.SimpleSearchBackend
+# -----------------------------------------------------------------------------
+PATIENT_SEARCH_BACKEND = os.environ.get("PATIENT_SEARCH_BACKEND", "")
+
+
 LOGIN_URL = "/login/"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/login/"
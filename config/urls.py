@@ -32,6 +32,7 @@ urlpatterns = [
     path("files/", include("files.urls")),
     path("users/", include("accounts.urls")),
     path("clinic/", include("clinics.urls")),
+    path("audit/", include("audit.urls")),
 ]
 
 # Media files are intentionally NOT served at /media/ directly.
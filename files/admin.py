@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Attachment
+from .models import Attachment, UploadSession
 
 
 @admin.register(Attachment)
@@ -27,3 +27,17 @@ class AttachmentAdmin(admin.ModelAdmin):
         if hasattr(request.user, 'clinic') and request.user.clinic:
             return qs.filter(clinic=request.user.clinic)
         return qs
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['original_filename', 'patient', 'clinic', 'created_by', 'status', 'received_bytes', 'total_size', 'updated_at']
+    list_filter = ['clinic', 'status']
+    readonly_fields = ['id', 'total_size', 'chunk_size', 'sha256', 'next_chunk', 'received_bytes', 'status', 'attachment', 'created_at', 'updated_at']
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        # If user has a clinic, filter by that clinic
+        if hasattr(request.user, 'clinic') and request.user.clinic:
+            return qs.filter(clinic=request.user.clinic)
+        return qs
@@ -0,0 +1,237 @@
+"""
+Chunked, resumable uploads.
+
+Protocol (JSON, see files/urls.py):
+
+1. POST patient/<id>/uploads/ with the file name, size, hex SHA-256 and
+   attachment details creates an UploadSession and returns its id and
+   chunk_size.
+2. PUT uploads/<id>/chunks/<index>/ sends chunk ``index`` (chunk_size bytes,
+   the last one shorter) as the raw request body, with its hex SHA-256 in
+   the X-Chunk-SHA256 header. Chunks must arrive in order; re-sending a chunk
+   that was already stored is accepted, so a client that lost the response
+   can simply retry. Writes to one session are serialized by a row lock.
+3. GET uploads/<id>/ returns next_chunk / received_bytes: after a network
+   drop the client resumes from there.
+4. POST uploads/<id>/complete/ checks the whole file, moves it into
+   attachment storage and creates the Attachment.
+
+Chunks are streamed from the request into a part file in
+ATTACHMENT_UPLOAD_TEMP_DIR (which must be shared by all workers), so no
+chunk is ever held in memory. Abandoned sessions are removed by the
+purge_upload_sessions management command.
+"""
+import hashlib
+import mimetypes
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Attachment, UploadSession
+from .storage import save_attachment
+from .thumbnails import generate_thumbnail
+from .uploadhandlers import content_matches_extension, sniff_content_type
+
+READ_SIZE = 64 * 1024
+
+
+class ChunkError(Exception):
+    """A chunk or completion request that cannot be accepted; ``status`` is the HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class _PartFile(File):
+    # Lets FileSystemStorage move the part file into place instead of copying it
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def upload_temp_dir():
+    path = settings.ATTACHMENT_UPLOAD_TEMP_DIR or os.path.join(
+        settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir(), "clinic-uploads"
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def part_path(session):
+    return os.path.join(upload_temp_dir(), f"{session.pk}.part")
+
+
+def discard_part(session):
+    try:
+        os.remove(part_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def session_state(session):
+    """JSON-serializable progress of ``session``."""
+    return {
+        "id": str(session.pk),
+        "url": reverse("files:upload_session", args=[session.pk]),
+        "status": session.status,
+        "chunk_size": session.chunk_size,
+        "chunk_count": session.chunk_count,
+        "total_size": session.total_size,
+        "next_chunk": session.next_chunk,
+        "received_bytes": session.received_bytes,
+        "attachment_id": session.attachment_id,
+    }
+
+
+def write_chunk(session, index, stream, sha256):
+    """
+    Stream chunk ``index`` from ``stream`` into the part file and record it.
+    Raise ChunkError when it is out of order, has the wrong size or fails
+    its checksum (the part file is then left as it was).
+
+    The session row is locked for the whole write, so a retry that overlaps
+    the original request waits for it and is then accepted as a duplicate.
+    """
+    if not sha256:
+        raise ChunkError("Missing X-Chunk-SHA256 header")
+
+    with transaction.atomic():
+        # ✅ one writer per session at a time
+        locked = UploadSession.objects.select_for_update().get(pk=session.pk)
+        session.status, session.next_chunk = locked.status, locked.next_chunk
+        session.received_bytes = locked.received_bytes
+
+        if session.status != UploadSession.Status.OPEN:
+            raise ChunkError("Upload session is already complete", status=409)
+        if index >= session.chunk_count:
+            raise ChunkError("Chunk index out of range")
+        if index < session.next_chunk:
+            # Already stored: a retry after a lost response
+            return session
+        if index > session.next_chunk:
+            raise ChunkError(f"Expected chunk {session.next_chunk}", status=409)
+
+        expected = session.chunk_length(index)
+        offset = index * session.chunk_size
+
+        path = part_path(session)
+        lost = (os.path.getsize(path) if os.path.exists(path) else 0) < offset
+        if lost:
+            # Part file lost (e.g. temp dir cleaned): the client has to start over
+            UploadSession.objects.filter(pk=session.pk).update(next_chunk=0, received_bytes=0)
+        else:
+            _write_part(session, path, index, offset, expected, stream, sha256)
+
+    if lost:
+        raise ChunkError("Upload data was lost; restart from chunk 0", status=409)
+    session.refresh_from_db(fields=["next_chunk", "received_bytes", "updated_at"])
+    return session
+
+
+def _write_part(session, path, index, offset, expected, stream, sha256):
+    """Write one checked chunk at ``offset`` of the part file and advance the session (under its lock)."""
+    digest = hashlib.sha256()
+    received = 0
+    # r+b, not append mode: writes land at ``offset`` whatever the file length
+    with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), "r+b") as part:
+        part.seek(offset)
+        while received <= expected:
+            data = stream.read(min(READ_SIZE, expected + 1 - received))
+            if not data:
+                break
+            digest.update(data)
+            part.write(data)
+            received += len(data)
+
+        if received != expected or digest.hexdigest() != sha256.lower():
+            part.truncate(offset)
+            if received != expected:
+                raise ChunkError(f"Chunk {index} must be {expected} bytes")
+            raise ChunkError(f"Checksum mismatch for chunk {index}")
+        # Drop anything a failed earlier attempt left past this chunk
+        part.truncate(offset + expected)
+
+        advanced = UploadSession.objects.filter(pk=session.pk, next_chunk=index).update(
+            next_chunk=F("next_chunk") + 1,
+            received_bytes=offset + expected,
+            updated_at=timezone.now(),
+        )
+        if not advanced:
+            # Someone else moved the session on: keep only what it records as received
+            recorded = UploadSession.objects.filter(pk=session.pk).values_list("received_bytes", flat=True).first()
+            part.truncate(recorded or 0)
+            raise ChunkError(f"Chunk {index} was not expected", status=409)
+
+
+def part_digest(session):
+    """(hex SHA-256, sniffed MIME type) of the part file, in a single read."""
+    digest = hashlib.sha256()
+    with open(part_path(session), "rb") as part:
+        head = part.read(READ_SIZE)
+        data = head
+        while data:
+            digest.update(data)
+            data = part.read(READ_SIZE)
+    return digest.hexdigest(), sniff_content_type(head)
+
+
+def complete_session(session):
+    """
+    Move the assembled file into attachment storage and create its
+    Attachment. Completing an already completed session returns the same
+    Attachment.
+    """
+    if session.status == UploadSession.Status.COMPLETE:
+        return session.attachment
+
+    if session.received_bytes != session.total_size:
+        raise ChunkError(f"Upload incomplete: expected chunk {session.next_chunk}", status=409)
+
+    # Claim the session so that concurrent completions do not create two attachments
+    claimed = UploadSession.objects.filter(pk=session.pk, status=UploadSession.Status.OPEN).update(
+        status=UploadSession.Status.COMPLETE
+    )
+    if not claimed:
+        session.refresh_from_db()
+        return session.attachment
+
+    try:
+        sha256, sniffed_type = part_digest(session)
+        if session.sha256 != sha256:
+            discard_part(session)
+            UploadSession.objects.filter(pk=session.pk).update(next_chunk=0, received_bytes=0)
+            raise ChunkError("Checksum mismatch for the assembled file; upload it again")
+        if not content_matches_extension(sniffed_type, os.path.splitext(session.original_filename)[1]):
+            raise ChunkError("The file content does not match its extension")
+
+        attachment = Attachment(
+            clinic_id=session.clinic_id,
+            patient_id=session.patient_id,
+            visit_id=session.visit_id,
+            uploaded_by_id=session.created_by_id,
+            original_filename=session.original_filename,
+            file_type=session.file_type,
+            file_size=session.total_size,
+            mime_type=sniffed_type or mimetypes.guess_type(session.original_filename)[0] or '',
+            sha256=sha256,
+            title=session.title,
+            notes=session.notes,
+        )
+        with open(part_path(session), "rb") as part:
+            save_attachment(attachment, _PartFile(part, name=session.original_filename))
+    except BaseException:
+        UploadSession.objects.filter(pk=session.pk).update(status=UploadSession.Status.OPEN)
+        raise
+
+    discard_part(session)
+    UploadSession.objects.filter(pk=session.pk).update(attachment=attachment)
+    session.status, session.attachment = UploadSession.Status.COMPLETE, attachment
+
+    generate_thumbnail(attachment)
+    return attachment
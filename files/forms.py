@@ -1,5 +1,27 @@
 from django import forms
-from .models import Attachment
+from django.conf import settings
+from .models import Attachment, UploadSession
+from .uploadhandlers import content_matches_extension
+
+# Allowed file extensions
+ALLOWED_EXTENSIONS = [
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp',  # Images
+    '.pdf',  # PDFs
+    '.doc', '.docx',  # Word documents
+]
+
+
+def validate_file_extension(filename):
+    if not filename.lower().endswith(tuple(ALLOWED_EXTENSIONS)):
+        raise forms.ValidationError(
+            f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+
+
+def validate_file_content(filename, sniffed_type):
+    ext = '.' + filename.lower().rsplit('.', 1)[-1]
+    if not content_matches_extension(sniffed_type, ext):
+        raise forms.ValidationError("The file content does not match its extension.")
 
 
 class AttachmentForm(forms.ModelForm):
@@ -40,17 +62,49 @@ class AttachmentForm(forms.ModelForm):
         if file.size > max_size:
             raise forms.ValidationError(f"File size must be under 10MB. Your file is {file.size / (1024*1024):.1f}MB.")
 
-        # Allowed file extensions
-        allowed_extensions = [
-            '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp',  # Images
-            '.pdf',  # PDFs
-            '.doc', '.docx',  # Word documents
-        ]
+        validate_file_extension(file.name)
 
-        file_ext = file.name.lower()
-        if not any(file_ext.endswith(ext) for ext in allowed_extensions):
-            raise forms.ValidationError(
-                f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"
-            )
+        # Magic bytes sniffed by files.uploadhandlers while the upload streamed in
+        if hasattr(file, 'sniffed_type'):
+            validate_file_content(file.name, file.sniffed_type)
 
         return file
+
+
+class UploadSessionForm(forms.ModelForm):
+    """
+    Starts a chunked upload (files.chunked) for files above the 10MB form limit.
+    """
+    class Meta:
+        model = UploadSession
+        fields = ['original_filename', 'total_size', 'sha256', 'file_type', 'title', 'notes', 'visit']
+
+    def __init__(self, *args, patient=None, clinic=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Limit visit choices to patient's visits only
+        if patient:
+            self.fields['visit'].queryset = patient.visits.filter(clinic=clinic)
+
+        # ✅ completion checks the assembled file against it
+        self.fields['sha256'].required = True
+
+    def clean_original_filename(self):
+        filename = self.cleaned_data['original_filename']
+        validate_file_extension(filename)
+        return filename
+
+    def clean_total_size(self):
+        size = self.cleaned_data['total_size']
+        max_size = settings.ATTACHMENT_UPLOAD_MAX_SIZE
+        if size <= 0:
+            raise forms.ValidationError("The file is empty.")
+        if size > max_size:
+            raise forms.ValidationError(f"File size must be under {max_size / (1024*1024):.0f}MB.")
+        return size
+
+    def clean_sha256(self):
+        sha256 = self.cleaned_data['sha256'].lower()
+        if (len(sha256) != 64 or any(c not in '0123456789abcdef' for c in sha256)):
+            raise forms.ValidationError("Expected a hex SHA-256 digest.")
+        return sha256
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from files.chunked import discard_part
+from files.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = "Delete chunked upload sessions (and their part files) idle for longer than ATTACHMENT_UPLOAD_SESSION_TTL."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=None,
+            help="Idle time in seconds. Defaults to ATTACHMENT_UPLOAD_SESSION_TTL.",
+        )
+
+    def handle(self, *args, older_than=None, **options):
+        ttl = settings.ATTACHMENT_UPLOAD_SESSION_TTL if older_than is None else older_than
+        cutoff = timezone.now() - timedelta(seconds=ttl)
+
+        stale = UploadSession.objects.filter(updated_at__lt=cutoff)
+        purged = 0
+        for session in stale.only("pk", "status").iterator():
+            if session.status == UploadSession.Status.OPEN:
+                discard_part(session)
+            session.delete()
+            purged += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} upload session(s)."))
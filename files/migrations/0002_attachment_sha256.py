@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("files", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attachment",
+            name="sha256",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Hex SHA-256 of the file content",
+                max_length=64,
+            ),
+        ),
+    ]
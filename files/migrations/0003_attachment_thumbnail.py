@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-17 18:40
+
+import files.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("files", "0002_attachment_sha256"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attachment",
+            name="thumbnail",
+            field=models.FileField(
+                blank=True,
+                editable=False,
+                help_text="Downscaled preview of image attachments (see files.thumbnails)",
+                max_length=255,
+                upload_to=files.models.attachment_upload_path,
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-17 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("files", "0003_attachment_thumbnail"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attachment",
+            index=models.Index(fields=["clinic", "sha256"], name="files_attac_clinic__b93b31_idx"),
+        ),
+    ]
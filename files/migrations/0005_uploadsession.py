@@ -0,0 +1,127 @@
+# Generated by Django 6.0 on 2026-10-17 19:30
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clinics", "0003_clinic_usage_counters"),
+        ("files", "0004_attachment_clinic_sha256_index"),
+        ("patients", "0006_patient_search_indexes"),
+        ("visits", "0004_visit_patient_timeline_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UploadSession",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("original_filename", models.CharField(max_length=255)),
+                (
+                    "file_type",
+                    models.CharField(
+                        choices=[
+                            ("xray", "X-Ray"),
+                            ("lab", "Lab Result"),
+                            ("prescription", "Prescription"),
+                            ("report", "Medical Report"),
+                            ("other", "Other"),
+                        ],
+                        default="other",
+                        max_length=20,
+                    ),
+                ),
+                ("title", models.CharField(blank=True, max_length=255)),
+                ("notes", models.TextField(blank=True)),
+                (
+                    "total_size",
+                    models.PositiveBigIntegerField(help_text="Announced file size in bytes"),
+                ),
+                ("chunk_size", models.PositiveIntegerField()),
+                (
+                    "sha256",
+                    models.CharField(
+                        blank=True,
+                        help_text="Optional hex SHA-256 of the whole file, checked on completion",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "next_chunk",
+                    models.PositiveIntegerField(default=0, help_text="Index of the next expected chunk"),
+                ),
+                ("received_bytes", models.PositiveBigIntegerField(default=0)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("open", "Open"), ("complete", "Complete")],
+                        default="open",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "attachment",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="files.attachment",
+                    ),
+                ),
+                (
+                    "clinic",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to="clinics.clinic",
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "patient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to="patients.patient",
+                    ),
+                ),
+                (
+                    "visit",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="upload_sessions",
+                        to="visits.visit",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["updated_at"], name="files_uploa_updated_702fa8_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("files", "0005_uploadsession"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="uploadsession",
+            name="sha256",
+            field=models.CharField(
+                blank=True, help_text="Hex SHA-256 of the whole file, checked on completion", max_length=64
+            ),
+        ),
+    ]
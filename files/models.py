@@ -1,4 +1,6 @@
+import math
 import os
+import uuid
 from django.conf import settings
 from django.db import models
 from django.utils import timezone
@@ -69,6 +71,14 @@ class Attachment(models.Model):
     )
     file_size = models.PositiveIntegerField(help_text="File size in bytes")
     mime_type = models.CharField(max_length=100, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, editable=False, help_text="Hex SHA-256 of the file content")
+    thumbnail = models.FileField(
+        upload_to=attachment_upload_path,
+        max_length=255,
+        blank=True,
+        editable=False,
+        help_text="Downscaled preview of image attachments (see files.thumbnails)",
+    )
 
     title = models.CharField(max_length=255, blank=True, help_text="Optional description")
     notes = models.TextField(blank=True)
@@ -108,4 +118,89 @@ class Attachment(models.Model):
             models.Index(fields=['clinic', 'patient']),
             models.Index(fields=['clinic', 'uploaded_at']),
             models.Index(fields=['patient', '-uploaded_at']),
+            models.Index(fields=['clinic', 'sha256']),
+        ]
+
+
+class UploadSession(models.Model):
+    """
+    A chunked, resumable upload in progress (see files.chunked).
+
+    Chunks are written in order to a temporary part file; completing the
+    session moves that file into attachment storage and creates the
+    Attachment.
+    """
+    class Status(models.TextChoices):
+        OPEN = 'open', 'Open'
+        COMPLETE = 'complete', 'Complete'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    clinic = models.ForeignKey(
+        Clinic,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+    )
+    patient = models.ForeignKey(
+        Patient,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+    )
+    visit = models.ForeignKey(
+        Visit,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_sessions',
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+    )
+
+    # Attachment details, applied when the session completes
+    original_filename = models.CharField(max_length=255)
+    file_type = models.CharField(
+        max_length=20,
+        choices=Attachment.FileType.choices,
+        default=Attachment.FileType.OTHER
+    )
+    title = models.CharField(max_length=255, blank=True)
+    notes = models.TextField(blank=True)
+
+    total_size = models.PositiveBigIntegerField(help_text="Announced file size in bytes")
+    chunk_size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True, help_text="Hex SHA-256 of the whole file, checked on completion")
+    next_chunk = models.PositiveIntegerField(default=0, help_text="Index of the next expected chunk")
+    received_bytes = models.PositiveBigIntegerField(default=0)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.OPEN)
+    attachment = models.ForeignKey(
+        Attachment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ClinicManager()
+
+    def __str__(self):
+        return f"{self.original_filename} ({self.received_bytes}/{self.total_size} bytes)"
+
+    @property
+    def chunk_count(self):
+        return max(1, math.ceil(self.total_size / self.chunk_size))
+
+    def chunk_length(self, index):
+        """Expected size of chunk ``index`` (the last one may be shorter)."""
+        return min(self.chunk_size, self.total_size - index * self.chunk_size)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at']),
         ]
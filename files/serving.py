@@ -0,0 +1,219 @@
+"""
+HTTP serving of attachment files.
+
+serve_attachment() answers conditional requests (If-None-Match /
+If-Modified-Since) with 304 before touching storage, serves single byte
+ranges as 206 Partial Content and marks every response as privately
+cacheable, so repeat views cost (almost) no bandwidth or disk I/O.
+
+With settings.ATTACHMENT_SERVE_BACKEND set to "nginx" (X-Accel-Redirect) or
+"sendfile" (X-Sendfile, Apache mod_xsendfile / lighttpd) the authorization,
+audit and conditional checks still run in Django, but the body (including
+range handling) is sent by the front web server, so the worker is released
+as soon as the permission check is done.
+
+serve_thumbnail() sends the downscaled preview of an image attachment with a
+long private cache lifetime; previews are not downloads and are not audited.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def attachment_etag(attachment):
+    """Strong ETag from the stored content hash, weak one from metadata for older rows."""
+    if attachment.sha256:
+        return f'"{attachment.sha256}"'
+    return f'W/"{attachment.pk}-{attachment.file_size}-{int(attachment.uploaded_at.timestamp())}"'
+
+
+def attachment_last_modified(attachment):
+    return int(attachment.uploaded_at.timestamp())
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range "bytes=" header into an inclusive (start, end).
+
+    Returns None when the header should be ignored (missing, malformed or
+    multi-range: the full file is served instead) and raises ValueError when
+    the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        # Only strong validators may be used with If-Range
+        return not etag.startswith("W/") and if_range == etag
+    date = parse_http_date_safe(if_range)
+    return date is not None and date >= last_modified
+
+
+class _RangeFile:
+    """Read-only view of ``length`` bytes of ``fh`` starting at ``start``."""
+
+    def __init__(self, fh, start, length):
+        self.fh = fh
+        self.remaining = length
+        fh.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fh.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.fh.close()
+
+
+def _set_common_headers(response, attachment, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    # Authenticated content: browser cache only, never shared caches
+    patch_cache_control(response, private=True, max_age=settings.ATTACHMENT_CACHE_MAX_AGE)
+    patch_vary_headers(response, ("Cookie",))
+
+
+def _offload_response(request, attachment, backend):
+    """
+    Empty response telling the front web server which file to send, or None
+    when the file has no local path (non-filesystem storage).
+    """
+    if backend == "nginx":
+        header, value = "X-Accel-Redirect", settings.ATTACHMENT_ACCEL_REDIRECT_PREFIX + quote(attachment.file.name)
+    elif backend == "sendfile":
+        try:
+            header, value = "X-Sendfile", attachment.file.path
+        except NotImplementedError:
+            return None
+    else:
+        raise ValueError(f"Unknown ATTACHMENT_SERVE_BACKEND {backend!r}")
+
+    response = HttpResponse(content_type=attachment.mime_type or "application/octet-stream")
+    response[header] = value
+    # The web server answers the Range header itself; remember where it starts for auditing
+    try:
+        byte_range = parse_range(request.headers.get("Range"), attachment.file_size)
+    except ValueError:
+        byte_range = None
+    response.range_start = byte_range[0] if byte_range else 0
+    return response
+
+
+def serve_attachment(request, attachment):
+    """
+    Build the response for downloading ``attachment`` (already authorized).
+
+    ``response.range_start`` holds the first byte of the transfer (0 for a
+    full download).
+    """
+    etag = attachment_etag(attachment)
+    last_modified = attachment_last_modified(attachment)
+    as_attachment = not (attachment.is_image() or attachment.is_pdf())
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        _set_common_headers(not_modified, attachment, etag, last_modified)
+        return not_modified
+
+    backend = settings.ATTACHMENT_SERVE_BACKEND
+    if backend != "django":
+        response = _offload_response(request, attachment, backend)
+        if response is not None:
+            response["Content-Disposition"] = content_disposition_header(as_attachment, attachment.original_filename)
+            _set_common_headers(response, attachment, etag, last_modified)
+            return response
+
+    try:
+        file_handle = attachment.file.open("rb")
+    except FileNotFoundError:
+        raise Http404("File not found")
+
+    size = attachment.file.size
+    content_type = attachment.mime_type or "application/octet-stream"
+
+    byte_range = None
+    if _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except ValueError:
+            file_handle.close()
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            _set_common_headers(response, attachment, etag, last_modified)
+            return response
+
+    if byte_range is None:
+        response = FileResponse(file_handle, content_type=content_type)
+        response["Content-Length"] = str(size)
+        response.range_start = 0
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(_RangeFile(file_handle, start, length), status=206, content_type=content_type)
+        response["Content-Length"] = str(length)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response.range_start = start
+
+    response["Content-Disposition"] = content_disposition_header(as_attachment, attachment.original_filename)
+    _set_common_headers(response, attachment, etag, last_modified)
+    return response
+
+
+def serve_thumbnail(request, attachment):
+    """Build the response for the (already generated) thumbnail of ``attachment``."""
+    # The thumbnail is derived from the original, so the original's validators apply
+    etag = attachment_etag(attachment)
+    etag = etag[:-1] + '-thumb"'
+    last_modified = attachment_last_modified(attachment)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        try:
+            file_handle = attachment.thumbnail.open("rb")
+        except FileNotFoundError:
+            raise Http404("Thumbnail not found")
+        content_type = mimetypes.guess_type(attachment.thumbnail.name)[0] or "application/octet-stream"
+        response = FileResponse(file_handle, content_type=content_type)
+        response["Content-Disposition"] = content_disposition_header(False, os.path.basename(attachment.thumbnail.name))
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=settings.ATTACHMENT_THUMBNAIL_MAX_AGE)
+    patch_vary_headers(response, ("Cookie",))
+    return response
@@ -0,0 +1,107 @@
+"""
+Where attachment files live on the storage backend.
+
+settings.ATTACHMENT_STORAGE_MODE selects the layout of new uploads:
+
+- "path" (default): clinic_X/patient_Y/<sanitized filename>, one file per
+  Attachment (see models.attachment_upload_path).
+- "content": clinic_X/blobs/ab/<sha256>, keyed by the SHA-256 of the
+  content only (not the file name), so uploading the same bytes again, for
+  any patient of the clinic and under any name, reuses the existing blob
+  (and its thumbnail) instead of writing a copy.
+
+Files are reference-counted by the Attachment rows pointing at them, so
+release_attachment_file() only removes a file once its last row is gone.
+Uploads (save_attachment) and releases lock the clinic row, so a release
+cannot delete a blob that a concurrent upload has just decided to reuse.
+Both layouts can coexist: switching modes affects new uploads only.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from clinics.models import Clinic
+
+STORAGE_MODES = ("path", "content")
+
+
+def storage_mode():
+    mode = settings.ATTACHMENT_STORAGE_MODE
+    if mode not in STORAGE_MODES:
+        raise ImproperlyConfigured(f"ATTACHMENT_STORAGE_MODE must be one of {STORAGE_MODES}, not {mode!r}")
+    return mode
+
+
+def blob_name(clinic_id, sha256):
+    return f"clinic_{clinic_id}/blobs/{sha256[:2]}/{sha256}"
+
+
+def is_blob_name(name):
+    parts = name.split("/")
+    return len(parts) == 4 and parts[1] == "blobs"
+
+
+@contextmanager
+def clinic_files_lock(clinic_id):
+    """Transaction holding a lock on the clinic row, serializing blob reuse and deletion."""
+    with transaction.atomic():
+        list(Clinic.objects.select_for_update().filter(pk=clinic_id).values_list("pk", flat=True))
+        yield
+
+
+def store_attachment_file(attachment, uploaded_file):
+    """
+    Point ``attachment.file`` at the stored content of ``uploaded_file``
+    before the row is saved. ``attachment.clinic_id`` and ``attachment.sha256``
+    must be set. Use save_attachment() unless already in clinic_files_lock().
+    """
+    if storage_mode() == "path":
+        # Written by FileField.pre_save under attachment_upload_path
+        attachment.file = uploaded_file
+        return
+
+    storage = attachment.file.field.storage
+    name = blob_name(attachment.clinic_id, attachment.sha256)
+    if not storage.exists(name):
+        saved = storage.save(name, uploaded_file)
+        if saved != name:
+            # The same content was stored concurrently: keep a single blob
+            storage.delete(saved)
+    attachment.file = name
+
+
+def save_attachment(attachment, uploaded_file):
+    """Store the file of a new ``attachment`` and save the row under clinic_files_lock()."""
+    with clinic_files_lock(attachment.clinic_id):
+        store_attachment_file(attachment, uploaded_file)
+        attachment.save()
+
+
+def file_references(attachment):
+    """Attachment rows (other than ``attachment``) sharing its stored file."""
+    qs = type(attachment).objects.filter(clinic_id=attachment.clinic_id, file=attachment.file.name)
+    if attachment.sha256:
+        # Served by the (clinic, sha256) index
+        qs = qs.filter(sha256=attachment.sha256)
+    if attachment.pk is not None:
+        qs = qs.exclude(pk=attachment.pk)
+    return qs
+
+
+def release_attachment_file(attachment):
+    """
+    Delete the stored file and thumbnail of ``attachment`` unless another row
+    still references them. Call after the row itself has been deleted.
+    """
+    if not attachment.file:
+        return False
+    with clinic_files_lock(attachment.clinic_id):
+        # Checked under the lock: an upload reusing the blob has committed its row by now
+        if file_references(attachment).exists():
+            return False
+        if attachment.thumbnail:
+            attachment.thumbnail.delete(save=False)
+        attachment.file.delete(save=False)
+    return True
@@ -1,3 +1,103 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from clinics.models import Clinic
+from patients.models import Patient
+from .chunked import ChunkError, complete_session, part_path, write_chunk
+from .models import Attachment, UploadSession
+from .storage import release_attachment_file, save_attachment
+
+
+class ChunkedUploadTests(TestCase):
+    DATA = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        settings_override = override_settings(
+            ATTACHMENT_UPLOAD_TEMP_DIR=os.path.join(self.temp_dir, "parts"),
+            MEDIA_ROOT=os.path.join(self.temp_dir, "media"),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        clinic = Clinic.objects.create(name="Uploads")
+        self.session = UploadSession.objects.create(
+            clinic=clinic,
+            patient=Patient.objects.create(clinic=clinic, full_name="Upload Patient"),
+            created_by=User.objects.create_user("uploader", password="x", role="doctor", clinic=clinic),
+            original_filename="scan.pdf",
+            file_type="report",
+            total_size=len(self.DATA),
+            chunk_size=4096,
+            sha256=hashlib.sha256(self.DATA).hexdigest(),
+        )
+
+    def send(self, index):
+        chunk = self.DATA[index * 4096:(index + 1) * 4096]
+        return write_chunk(self.session, index, io.BytesIO(chunk), hashlib.sha256(chunk).hexdigest())
+
+    def part(self):
+        with open(part_path(self.session), "rb") as fh:
+            return fh.read()
+
+    def test_retried_and_leftover_bytes_do_not_corrupt_the_file(self):
+        self.send(0)
+        self.send(0)  # retry of a stored chunk is a no-op
+        with open(part_path(self.session), "ab") as fh:
+            fh.write(b"junk left by an interrupted writer")
+        self.send(1)
+        self.send(2)
+
+        self.assertEqual(self.part(), self.DATA)
+        self.assertEqual(complete_session(self.session).sha256, self.session.sha256)
+
+    def test_completion_checks_the_whole_file(self):
+        UploadSession.objects.filter(pk=self.session.pk).update(sha256="0" * 64)
+        self.session.refresh_from_db()
+        for index in range(self.session.chunk_count):
+            self.send(index)
+
+        with self.assertRaisesMessage(ChunkError, "Checksum mismatch for the assembled file"):
+            complete_session(self.session)
+
+
+class ContentStorageTests(TestCase):
+    DATA = b"\x89PNG\r\n\x1a\n" + b"0" * 100
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.temp_dir, ATTACHMENT_STORAGE_MODE="content")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.clinic = Clinic.objects.create(name="Blobs")
+        self.patient = Patient.objects.create(clinic=self.clinic, full_name="Blob Patient")
+
+    def upload(self, filename):
+        attachment = Attachment(
+            clinic=self.clinic, patient=self.patient, original_filename=filename, file_type="other",
+            file_size=len(self.DATA), sha256=hashlib.sha256(self.DATA).hexdigest(),
+        )
+        save_attachment(attachment, SimpleUploadedFile(filename, self.DATA))
+        return attachment
+
+    def test_same_content_under_any_name_shares_one_blob(self):
+        first, second = self.upload("scan.jpg"), self.upload("scan.JPEG")
+        name, storage = first.file.name, first.file.storage
+        self.assertEqual(second.file.name, name)
+
+        first.delete()
+        self.assertFalse(release_attachment_file(first))
+        self.assertTrue(storage.exists(name))
+
+        second.delete()
+        self.assertTrue(release_attachment_file(second))
+        self.assertFalse(storage.exists(name))
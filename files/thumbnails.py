@@ -0,0 +1,93 @@
+"""
+Downscaled previews of image attachments.
+
+A thumbnail is a WebP file (JPEG when Pillow lacks WebP support) stored next
+to the original, under a thumbs/ folder of the same clinic_X/patient_Y
+directory, and recorded on Attachment.thumbnail. It is created on upload and,
+for older rows or uploads where generation failed, on the first request to
+the thumbnail endpoint. Content-addressed originals (see files.storage)
+share one thumbnail between all the rows referencing them.
+
+Pillow is only imported when a thumbnail is actually built.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+from .storage import is_blob_name
+
+logger = logging.getLogger(__name__)
+
+
+def _output_format():
+    from PIL import features
+
+    if features.check("webp"):
+        return "WEBP", ".webp"
+    return "JPEG", ".jpg"
+
+
+def thumbnail_name(attachment, ext):
+    """clinic_X/patient_Y/thumbs/<original file name>.<size><ext>"""
+    directory, base = os.path.split(attachment.file.name)
+    return f"{directory}/thumbs/{base}.{settings.ATTACHMENT_THUMBNAIL_SIZE}{ext}"
+
+
+def render_thumbnail(fh, size, image_format):
+    """Encode a thumbnail fitting in size x size of the image in ``fh``."""
+    from PIL import Image, ImageOps
+
+    with Image.open(fh) as image:
+        # Let the JPEG decoder downscale while decoding (much faster for large scans)
+        image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        if image_format == "WEBP" and has_alpha:
+            image = image.convert("RGBA")
+        else:
+            image = image.convert("RGB")
+
+        buffer = BytesIO()
+        image.save(buffer, image_format, quality=80)
+    return buffer.getvalue()
+
+
+def generate_thumbnail(attachment):
+    """
+    Build and store the thumbnail of ``attachment`` and return its storage
+    name, or None when the file is not an image Pillow can read.
+    """
+    if not (attachment.file and attachment.is_image()):
+        return None
+
+    storage = attachment.file.storage
+    try:
+        image_format, ext = _output_format()
+        name = thumbnail_name(attachment, ext)
+        if is_blob_name(attachment.file.name) and storage.exists(name):
+            # Content-addressed original shared with another row: so is its thumbnail
+            data = None
+        else:
+            with attachment.file.open("rb") as fh:
+                data = render_thumbnail(fh, settings.ATTACHMENT_THUMBNAIL_SIZE, image_format)
+    except Exception:
+        # Missing file, corrupt or oversized image, Pillow not installed...
+        logger.warning("Could not build a thumbnail for attachment %s", attachment.pk, exc_info=True)
+        return None
+
+    if data is not None:
+        name = storage.save(name, ContentFile(data))
+
+    # Another request may have generated it concurrently: keep the first one
+    updated = type(attachment).objects.filter(pk=attachment.pk, thumbnail="").update(thumbnail=name)
+    if not updated:
+        if data is not None:
+            storage.delete(name)
+        name = type(attachment).objects.filter(pk=attachment.pk).values_list("thumbnail", flat=True).first()
+    attachment.thumbnail.name = name
+    return name
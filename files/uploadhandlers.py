@@ -0,0 +1,104 @@
+"""
+Upload handlers that inspect files while Django spools them.
+
+The handlers below replace Django's default pair (see FILE_UPLOAD_HANDLERS
+in settings). Each chunk is fed to a SHA-256 digest and the first bytes are
+kept for content sniffing as it streams in, so the resulting uploaded file
+carries:
+
+- ``sha256``: hex digest of the content
+- ``sniffed_type``: MIME type detected from the magic bytes, or "" when the
+  format is not recognised
+
+Validation, deduplication and integrity checks then never need a second
+read of the file.
+"""
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+SNIFF_BYTES = 1024
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# (offset, signature, MIME type), checked in order
+SIGNATURES = [
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"BM", "image/bmp"),
+    (8, b"WEBP", "image/webp"),
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"),  # OLE2 (.doc)
+    (0, b"PK\x03\x04", DOCX_TYPE),  # ZIP container (.docx)
+]
+
+# Content types acceptable for each allowed extension
+EXTENSION_TYPES = {
+    ".jpg": {"image/jpeg"},
+    ".jpeg": {"image/jpeg"},
+    ".png": {"image/png"},
+    ".gif": {"image/gif"},
+    ".bmp": {"image/bmp"},
+    ".webp": {"image/webp"},
+    ".pdf": {"application/pdf"},
+    ".doc": {"application/msword"},
+    ".docx": {DOCX_TYPE},
+}
+
+
+def sniff_content_type(head):
+    """MIME type for the first bytes of a file, or "" if unknown."""
+    for offset, signature, content_type in SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            if content_type == "image/webp" and not head.startswith(b"RIFF"):
+                continue
+            return content_type
+    if b"%PDF-" in head:
+        # Readers accept a PDF header anywhere in the first 1024 bytes
+        return "application/pdf"
+    return ""
+
+
+def content_matches_extension(sniffed_type, extension):
+    """False when the content is clearly not what the extension claims."""
+    expected = EXTENSION_TYPES.get(extension.lower())
+    if expected is None:
+        return True
+    return sniffed_type in expected
+
+
+class DigestMixin:
+    def new_file(self, *args, **kwargs):
+        # Before super(): the memory handler raises StopFutureHandlers from new_file()
+        self.digest = hashlib.sha256()
+        self.head = b""
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.stores_data():
+            self.digest.update(raw_data)
+            if len(self.head) < SNIFF_BYTES:
+                self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        if uploaded_file is not None:
+            uploaded_file.sha256 = self.digest.hexdigest()
+            uploaded_file.sniffed_type = sniff_content_type(self.head)
+        return uploaded_file
+
+    def stores_data(self):
+        return True
+
+
+class DigestingMemoryFileUploadHandler(DigestMixin, MemoryFileUploadHandler):
+    def stores_data(self):
+        # Larger files are passed on to the temporary file handler
+        return self.activated
+
+
+class DigestingTemporaryFileUploadHandler(DigestMixin, TemporaryFileUploadHandler):
+    pass
@@ -6,5 +6,12 @@ app_name = 'files'
 urlpatterns = [
     path('patient/<int:patient_pk>/upload/', views.attachment_upload, name='upload'),
     path('<int:pk>/download/', views.attachment_download, name='download'),
+    path('<int:pk>/thumbnail/', views.attachment_thumbnail, name='thumbnail'),
     path('<int:pk>/delete/', views.attachment_delete, name='delete'),
+
+    # Chunked / resumable uploads
+    path('patient/<int:patient_pk>/uploads/', views.upload_session_create, name='upload_session_create'),
+    path('uploads/<uuid:pk>/', views.upload_session_detail, name='upload_session'),
+    path('uploads/<uuid:pk>/chunks/<int:index>/', views.upload_session_chunk, name='upload_session_chunk'),
+    path('uploads/<uuid:pk>/complete/', views.upload_session_complete, name='upload_session_complete'),
 ]
@@ -1,17 +1,32 @@
+import hashlib
 import mimetypes
-import os
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import FileResponse, HttpResponseForbidden, Http404
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods, require_POST
 
 from accounts.permissions import role_required
 from audit.models import AuditEvent
 from audit.utils import log_event
 from patients.models import Patient
-from .forms import AttachmentForm
-from .models import Attachment
+from .chunked import ChunkError, complete_session, discard_part, session_state, write_chunk
+from .forms import AttachmentForm, UploadSessionForm
+from .models import Attachment, UploadSession
+from .serving import serve_attachment, serve_thumbnail
+from .storage import release_attachment_file, save_attachment
+from .thumbnails import generate_thumbnail
+
+
+def file_sha256(uploaded_file):
+    """Hex SHA-256 of an uploaded file, read in chunks (when not computed by the upload handler)."""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
 
 
 @login_required
@@ -35,9 +50,20 @@ def attachment_upload(request, patient_pk):
             uploaded_file = request.FILES['file']
             attachment.original_filename = uploaded_file.name
             attachment.file_size = uploaded_file.size
-            attachment.mime_type = uploaded_file.content_type or mimetypes.guess_type(uploaded_file.name)[0] or ''
+            # Hash and sniffed type come from files.uploadhandlers (no second read)
+            attachment.mime_type = (
+                getattr(uploaded_file, 'sniffed_type', '')
+                or uploaded_file.content_type
+                or mimetypes.guess_type(uploaded_file.name)[0]
+                or ''
+            )
+            attachment.sha256 = getattr(uploaded_file, 'sha256', None) or file_sha256(uploaded_file)
 
-            attachment.save()
+            # Path or content-addressed layout (ATTACHMENT_STORAGE_MODE)
+            save_attachment(attachment, uploaded_file)
+
+            # Preview for the patient page; on failure it is retried on first view
+            generate_thumbnail(attachment)
 
             # Audit log
             log_event(
@@ -76,30 +102,44 @@ def attachment_download(request, pk):
     if not attachment.file:
         raise Http404("File not found")
 
-    # Audit log
-    log_event(
-        request,
-        action=AuditEvent.Action.FILE_DOWNLOADED,
-        obj=attachment,
-        patient_id=attachment.patient_id,
-        metadata={
-            'filename': attachment.original_filename,
-        }
-    )
+    response = serve_attachment(request, attachment)
 
-    # Serve file
-    file_handle = attachment.file.open('rb')
+    # Audit each new download once: revalidations (304) and follow-up range
+    # requests of the same transfer are not logged again
+    if response.status_code in (200, 206) and getattr(response, "range_start", None) == 0:
+        log_event(
+            request,
+            action=AuditEvent.Action.FILE_DOWNLOADED,
+            obj=attachment,
+            patient_id=attachment.patient_id,
+            metadata={
+                'filename': attachment.original_filename,
+            }
+        )
 
-    # Determine if we should display inline (images, PDFs) or force download
-    content_disposition = 'inline' if (attachment.is_image() or attachment.is_pdf()) else 'attachment'
+    return response
 
-    response = FileResponse(
-        file_handle,
-        content_type=attachment.mime_type or 'application/octet-stream'
-    )
-    response['Content-Disposition'] = f'{content_disposition}; filename="{attachment.original_filename}"'
 
-    return response
+@login_required
+@role_required("doctor", "assistant", "admin")
+def attachment_thumbnail(request, pk):
+    """
+    Downscaled preview of an image attachment (built on first request if missing).
+    """
+    attachment = get_object_or_404(Attachment.objects.for_clinic(request.clinic), pk=pk)
+
+    if not attachment.is_image():
+        raise Http404("No thumbnail for this file type")
+
+    if not attachment.thumbnail or not attachment.thumbnail.storage.exists(attachment.thumbnail.name):
+        attachment.thumbnail.name = ""
+        Attachment.objects.filter(pk=attachment.pk).update(thumbnail="")
+        if not generate_thumbnail(attachment):
+            raise Http404("Thumbnail not available")
+
+    # Not audited: previews are part of viewing the patient record, and
+    # opening the original still logs FILE_DOWNLOADED
+    return serve_thumbnail(request, attachment)
 
 
 @login_required
@@ -117,10 +157,6 @@ def attachment_delete(request, pk):
         filename = attachment.original_filename
         file_type = attachment.file_type
 
-        # Delete the physical file
-        if attachment.file:
-            attachment.file.delete(save=False)
-
         # Audit log before deleting the object
         log_event(
             request,
@@ -133,8 +169,10 @@ def attachment_delete(request, pk):
             }
         )
 
-        # Delete the database record
+        # Delete the database record, then the stored file and preview
+        # unless other attachments share the same content
         attachment.delete()
+        release_attachment_file(attachment)
 
         messages.success(request, f'File "{filename}" deleted.')
         return redirect("patients:detail", pk=patient_pk)
@@ -143,3 +181,109 @@ def attachment_delete(request, pk):
         "attachment": attachment,
         "patient": attachment.patient,
     })
+
+
+# ── Chunked uploads (protocol in files/chunked.py) ─────────────────────────────
+
+def _own_upload_session(request, pk):
+    # Sessions are private to the user who started them
+    return get_object_or_404(
+        UploadSession.objects.for_clinic(request.clinic).filter(created_by=request.user),
+        pk=pk,
+    )
+
+
+@login_required
+@role_required("doctor", "assistant", "admin")
+@require_POST
+def upload_session_create(request, patient_pk):
+    """
+    Start a chunked upload for a patient.
+    """
+    patient = get_object_or_404(Patient.objects.for_clinic(request.clinic), pk=patient_pk)
+
+    form = UploadSessionForm(request.POST, patient=patient, clinic=request.clinic)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    session = form.save(commit=False)
+    session.clinic = request.clinic
+    session.patient = patient
+    session.created_by = request.user
+    session.chunk_size = settings.ATTACHMENT_UPLOAD_CHUNK_SIZE
+    session.save()
+
+    return JsonResponse(session_state(session), status=201)
+
+
+@login_required
+@role_required("doctor", "assistant", "admin")
+@require_http_methods(["GET", "DELETE"])
+def upload_session_detail(request, pk):
+    """
+    Progress of a chunked upload (GET, to resume) or abort it (DELETE).
+    """
+    session = _own_upload_session(request, pk)
+
+    if request.method == "DELETE":
+        discard_part(session)
+        session.delete()
+        return HttpResponse(status=204)
+
+    return JsonResponse(session_state(session))
+
+
+@login_required
+@role_required("doctor", "assistant", "admin")
+@require_http_methods(["PUT"])
+def upload_session_chunk(request, pk, index):
+    """
+    Receive one chunk of a chunked upload as the raw request body.
+    """
+    session = _own_upload_session(request, pk)
+
+    try:
+        write_chunk(session, index, request, request.headers.get("X-Chunk-SHA256", ""))
+    except ChunkError as exc:
+        return JsonResponse({"error": str(exc), **session_state(session)}, status=exc.status)
+
+    return JsonResponse(session_state(session))
+
+
+@login_required
+@role_required("doctor", "assistant", "admin")
+@require_POST
+def upload_session_complete(request, pk):
+    """
+    Assemble a fully received chunked upload into an Attachment.
+    """
+    session = _own_upload_session(request, pk)
+    already_complete = session.status == UploadSession.Status.COMPLETE
+
+    try:
+        attachment = complete_session(session)
+    except ChunkError as exc:
+        session.refresh_from_db()
+        return JsonResponse({"error": str(exc), **session_state(session)}, status=exc.status)
+
+    if attachment is None:
+        raise Http404("Attachment no longer exists")
+
+    if not already_complete:
+        log_event(
+            request,
+            action=AuditEvent.Action.FILE_UPLOADED,
+            obj=attachment,
+            patient_id=attachment.patient_id,
+            metadata={
+                'filename': attachment.original_filename,
+                'file_type': attachment.file_type,
+                'file_size': attachment.file_size,
+                'chunked': True,
+            }
+        )
+
+    return JsonResponse({
+        **session_state(session),
+        "redirect_url": reverse("patients:detail", args=[attachment.patient_id]),
+    })
@@ -0,0 +1,70 @@
+# Generated by Django 6.0 on 2026-10-17 18:08
+
+from django.db import migrations, models
+
+
+def _normalize_phone(phone):
+    # Frozen copy of patients.models.normalize_phone at the time of this migration
+    if not phone:
+        return ""
+    phone = phone.strip().replace(" ", "").replace("-", "")
+    if phone.startswith("+20"):
+        phone = "0" + phone[3:]
+    elif phone.startswith("20") and len(phone) >= 12:
+        phone = "0" + phone[2:]
+    return phone
+
+
+def _normalize_national_id(national_id):
+    return national_id.strip().lower() if national_id else ""
+
+
+def backfill_normalized_lookup_keys(apps, schema_editor):
+    Patient = apps.get_model("patients", "Patient")
+
+    batch = []
+    rows = Patient.objects.only("id", "phone", "national_id").order_by("pk").iterator(chunk_size=2000)
+    for patient in rows:
+        patient.normalized_phone = _normalize_phone(patient.phone)
+        patient.normalized_national_id = _normalize_national_id(patient.national_id)
+        batch.append(patient)
+        if len(batch) >= 2000:
+            Patient.objects.bulk_update(batch, ["normalized_phone", "normalized_national_id"])
+            batch = []
+    if batch:
+        Patient.objects.bulk_update(batch, ["normalized_phone", "normalized_national_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clinics", "0002_backfill_default_clinic"),
+        ("patients", "0004_patient_unique_national_id_per_clinic_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="normalized_national_id",
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.AddField(
+            model_name="patient",
+            name="normalized_phone",
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.RunPython(backfill_normalized_lookup_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="patient",
+            index=models.Index(
+                fields=["clinic", "normalized_phone"], name="patients_pa_clinic__22d802_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patient",
+            index=models.Index(
+                fields=["clinic", "normalized_national_id"],
+                name="patients_pa_clinic__a27b02_idx",
+            ),
+        ),
+    ]
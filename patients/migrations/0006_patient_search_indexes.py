@@ -0,0 +1,52 @@
+# Generated by Django 6.0 on 2026-10-17 18:30
+
+from django.db import migrations
+
+TRIGRAM_COLUMNS = ("normalized_name", "normalized_phone", "normalized_national_id")
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in TRIGRAM_COLUMNS:
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS patients_patient_{column}_trgm "
+                f"ON patients_patient USING gin ({column} gin_trgm_ops)"
+            )
+
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS patients_patient_fts USING fts5("
+            "clinic_key, normalized_name, normalized_phone, normalized_national_id, "
+            "tokenize='trigram')"
+        )
+        schema_editor.execute(
+            "INSERT INTO patients_patient_fts "
+            "(rowid, clinic_key, normalized_name, normalized_phone, normalized_national_id) "
+            "SELECT id, '|' || clinic_id || '|', normalized_name, normalized_phone, normalized_national_id "
+            "FROM patients_patient"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        for column in TRIGRAM_COLUMNS:
+            schema_editor.execute(f"DROP INDEX IF EXISTS patients_patient_{column}_trgm")
+
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS patients_patient_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0005_patient_normalized_lookup_keys"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
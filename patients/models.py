@@ -1,11 +1,49 @@
+from collections import Counter
+
 from django.db import models
 from django.utils import timezone
 from clinics.models import Clinic
-from clinics.managers import ClinicManager
+from clinics.managers import ClinicManager, ClinicQuerySet
+from clinics.stats import adjust_clinic_counters, invalidate_clinic_stats
+from .normalization import (  # noqa: F401 (re-exported)
+    normalize_name,
+    normalize_names,
+    normalize_national_id,
+    normalize_national_ids,
+    normalize_phone,
+    normalize_phones,
+)
+
+
+class PatientQuerySet(ClinicQuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        bulk_create skips Patient.save() and post_save, so fill the normalized
+        lookup keys first and afterwards index the new rows for search and
+        update the clinic usage counters.
+        """
+        objs = list(objs)
+        names = normalize_names(obj.full_name for obj in objs)
+        phones = normalize_phones(obj.phone for obj in objs)
+        national_ids = normalize_national_ids(obj.national_id for obj in objs)
+        for obj, name, phone, national_id in zip(objs, names, phones, national_ids):
+            obj.normalized_name, obj.normalized_phone, obj.normalized_national_id = name, phone, national_id
+
+        created = super().bulk_create(objs, *args, **kwargs)
+
+        if not kwargs.get("ignore_conflicts") and not kwargs.get("update_conflicts"):
+            from .search import get_search_backend
 
+            get_search_backend().index_patients(created)
+            for clinic_id, count in Counter(obj.clinic_id for obj in created).items():
+                adjust_clinic_counters(clinic_id, patient_count=count)
+                invalidate_clinic_stats(clinic_id)
+        return created
 
-def normalize_name(name: str) -> str:
-    return " ".join(name.lower().split()) if name else ""
+
+class PatientManager(ClinicManager):
+    def get_queryset(self):
+        return PatientQuerySet(self.model, using=self._db)
 
 
 class Patient(models.Model):
@@ -20,6 +58,10 @@ class Patient(models.Model):
     phone = models.CharField(max_length=30, blank=True, db_index=True)
     national_id = models.CharField(max_length=30, blank=True, db_index=True)
 
+    # Persisted lookup keys for duplicate detection (filled in by save())
+    normalized_phone = models.CharField(max_length=30, blank=True, editable=False)
+    normalized_national_id = models.CharField(max_length=30, blank=True, editable=False)
+
     sex = models.CharField(
         max_length=10,
         choices=(("M", "Male"), ("F", "Female"), ("U", "Unknown")),
@@ -33,10 +75,15 @@ class Patient(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
-    objects = ClinicManager()
+    objects = PatientManager()
 
-    def save(self, *args, **kwargs):
+    def normalize_fields(self):
         self.normalized_name = normalize_name(self.full_name)
+        self.normalized_phone = normalize_phone(self.phone)
+        self.normalized_national_id = normalize_national_id(self.national_id)
+
+    def save(self, *args, **kwargs):
+        self.normalize_fields()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -51,6 +98,8 @@ class Patient(models.Model):
             models.Index(fields=["clinic", "phone"]),
             models.Index(fields=["clinic", "national_id"]),
             models.Index(fields=["clinic", "normalized_name"]),
+            models.Index(fields=["clinic", "normalized_phone"]),
+            models.Index(fields=["clinic", "normalized_national_id"]),
         ]
         constraints = [
             # Ensure national_id is unique within each clinic (when provided)
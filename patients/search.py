@@ -0,0 +1,190 @@
+"""
+Pluggable patient search engines.
+
+The engine is picked with settings.PATIENT_SEARCH_BACKEND (dotted path to one of
+the classes below). When it is left empty, the engine matching the default
+database is used: pg_trgm on PostgreSQL, FTS5 on SQLite and plain LIKE scans
+everywhere else.
+
+Every engine returns a clinic-scoped Patient queryset annotated with
+``search_rank`` and exposes the ``ordering`` that sorts it best match first.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.db.models.expressions import RawSQL
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Patient
+from .normalization import normalize_name, normalize_national_id, normalize_phone
+
+FTS_TABLE = "patients_patient_fts"
+
+
+class BaseSearchBackend:
+    #: Ordering of search results, best match first (must end with a unique key)
+    ordering = ("normalized_name", "id")
+
+    def search(self, clinic, query):
+        """Return patients of ``clinic`` matching ``query``, annotated with search_rank."""
+        raise NotImplementedError
+
+    def index_patient(self, patient):
+        """Called after a patient is saved. Engines backed by DB indexes need nothing."""
+
+    def index_patients(self, patients):
+        """Index many patients at once (bulk_create skips post_save)."""
+        for patient in patients:
+            self.index_patient(patient)
+
+    def remove_patient(self, patient_id):
+        """Called after a patient is deleted."""
+
+    @staticmethod
+    def normalized_terms(query):
+        return {
+            "normalized_name": normalize_name(query),
+            "normalized_phone": normalize_phone(query),
+            "normalized_national_id": normalize_national_id(query),
+        }
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    Substring search with LIKE '%…%'. Works on any database but cannot use an
+    index, so cost grows with clinic size. Kept as the portable fallback.
+    """
+
+    def search(self, clinic, query):
+        lookup = Q()
+        for column, term in self.normalized_terms(query).items():
+            if term:
+                lookup |= Q(**{f"{column}__contains": term})
+
+        return (
+            Patient.objects
+            .for_clinic(clinic)
+            .filter(lookup)
+            .annotate(search_rank=Value(0))
+        )
+
+
+class TrigramSearchBackend(BaseSearchBackend):
+    """
+    PostgreSQL engine. The GIN (gin_trgm_ops) indexes created by migration
+    patients.0006 serve the substring filters; results are ranked by trigram
+    word similarity against the patient's name.
+    """
+    ordering = ("-search_rank", "normalized_name", "id")
+
+    def search(self, clinic, query):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        terms = self.normalized_terms(query)
+        lookup = Q()
+        for column, term in terms.items():
+            if term:
+                lookup |= Q(**{f"{column}__contains": term})
+
+        return (
+            Patient.objects
+            .for_clinic(clinic)
+            .filter(lookup)
+            .annotate(search_rank=TrigramWordSimilarity(Value(terms["normalized_name"]), F("normalized_name")))
+        )
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """
+    SQLite engine backed by an FTS5 shadow table (trigram tokenizer) keyed by
+    patient id. The table is created by migration patients.0006 and kept in
+    sync by the post_save/post_delete handlers in patients.signals.
+
+    The clinic is stored as a delimited token so that the clinic filter is part
+    of the full-text match instead of a scan over every tenant's hits.
+    """
+    ordering = ("search_rank", "normalized_name", "id")  # bm25: lower is better
+
+    # FTS5 trigram tokenizer cannot match terms shorter than three characters
+    MIN_TERM_LENGTH = 3
+
+    @staticmethod
+    def clinic_token(clinic_id):
+        return f"|{clinic_id}|"
+
+    @staticmethod
+    def _phrase(term):
+        return '"' + term.replace('"', '""') + '"'
+
+    def match_expression(self, clinic_id, query):
+        columns = [
+            f"{column} : {self._phrase(term)}"
+            for column, term in self.normalized_terms(query).items()
+            if len(term) >= self.MIN_TERM_LENGTH
+        ]
+        if not columns:
+            return None
+        return f"clinic_key : {self._phrase(self.clinic_token(clinic_id))} AND ({' OR '.join(columns)})"
+
+    def search(self, clinic, query):
+        clinic_id = getattr(clinic, "pk", clinic)
+        match = self.match_expression(clinic_id, query)
+        if match is None:
+            # Too short for the trigram index; the clinic filter keeps this bounded
+            return SimpleSearchBackend().search(clinic, query)
+
+        return (
+            Patient.objects
+            .for_clinic(clinic)
+            .filter(pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]))
+            .annotate(search_rank=RawSQL(
+                f"SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {Patient._meta.db_table}.id",
+                [match],
+            ))
+        )
+
+    def index_patients(self, patients):
+        rows = [
+            (p.pk, self.clinic_token(p.clinic_id), p.normalized_name, p.normalized_phone, p.normalized_national_id)
+            for p in patients
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, clinic_key, normalized_name, normalized_phone, normalized_national_id) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+
+    def index_patient(self, patient):
+        self.index_patients([patient])
+
+    def remove_patient(self, patient_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [patient_id])
+
+
+DEFAULT_BACKENDS = {
+    "postgresql": "patients.search.TrigramSearchBackend",
+    "sqlite": "patients.search.SQLiteFTSSearchBackend",
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    path = getattr(settings, "PATIENT_SEARCH_BACKEND", "") or DEFAULT_BACKENDS.get(
+        connection.vendor, "patients.search.SimpleSearchBackend"
+    )
+    return import_string(path)()
+
+
+@receiver(setting_changed)
+def _reset_search_backend(setting, **kwargs):
+    if setting == "PATIENT_SEARCH_BACKEND":
+        get_search_backend.cache_clear()
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Patient
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Patient)
+def index_patient_for_search(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index_patient(instance)
+
+
+@receiver(post_delete, sender=Patient)
+def remove_patient_from_search(sender, instance, **kwargs):
+    get_search_backend().remove_patient(instance.pk)
@@ -1,3 +1,22 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .normalization import (
+    normalize_name, normalize_names, normalize_national_id, normalize_national_ids, normalize_phone, normalize_phones,
+)
+
+
+class NormalizationTests(SimpleTestCase):
+    def test_phone_formats(self):
+        for phone in ("01001234567", "+201001234567", "201001234567", "0100 123-4567", " +20 100 123 4567 "):
+            with self.subTest(phone=phone):
+                self.assertEqual(normalize_phone(phone), "01001234567")
+        # Too short for a country code
+        self.assertEqual(normalize_phone("2010123"), "2010123")
+
+    def test_batch_matches_single_values(self):
+        names = ["  Ahmed  MOHAMED ", "", None, "Nour"]
+        phones = ["+20 100 123 4567", "", None, "2010123"]
+        national_ids = [" 29001011234567 ", "", None, "A12"]
+        self.assertEqual(normalize_names(names), [normalize_name(value) for value in names])
+        self.assertEqual(normalize_phones(phones), [normalize_phone(value) for value in phones])
+        self.assertEqual(normalize_national_ids(national_ids), [normalize_national_id(value) for value in national_ids])
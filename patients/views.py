@@ -1,24 +1,26 @@
-import time
-from datetime import timedelta
-from django.utils import timezone
-
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db import IntegrityError
-from django.db.models import Q, Count
+from django.db.models import Q
 from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 
 from accounts.models import User
 from accounts.permissions import role_required
 from audit.models import AuditEvent
+from audit.throttle import should_log
 from audit.utils import log_event
+from clinics.caching import patient_fragment_versions
+from clinics.pagination import KeysetPaginator
+from clinics.stats import get_clinic_stats
 from files.models import Attachment
 from visits.forms import VisitForm
 from visits.models import Visit
 from .forms import PatientForm
 from .models import Patient
+from .normalization import normalize_national_id, normalize_phone
+from .search import get_search_backend
 
 
 @login_required
@@ -27,20 +29,10 @@ def admin_dashboard(request):
     """Admin dashboard showing clinic statistics and management tools."""
     clinic = request.clinic
 
-    # Get statistics
-    total_patients = Patient.objects.for_clinic(clinic).count()
-    total_visits = Visit.objects.for_clinic(clinic).count()
-    total_files = Attachment.objects.for_clinic(clinic).count()
-
-    # Recent activity (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_patients = Patient.objects.for_clinic(clinic).filter(created_at__gte=thirty_days_ago).count()
-    recent_visits = Visit.objects.for_clinic(clinic).filter(visit_datetime__gte=thirty_days_ago).count()
+    # All counts come from one query, cached per clinic (see clinics.stats)
+    stats = get_clinic_stats(clinic)
 
-    # User statistics
-    users = User.objects.filter(clinic=clinic).select_related('clinic')
-    total_users = users.count()
-    users_by_role = users.values('role').annotate(count=Count('id')).order_by('role')
+    users = User.objects.filter(clinic=clinic).order_by('username')
 
     # Recent audit events
     recent_audit = (
@@ -52,13 +44,7 @@ def admin_dashboard(request):
 
     context = {
         'clinic': clinic,
-        'total_patients': total_patients,
-        'total_visits': total_visits,
-        'total_files': total_files,
-        'recent_patients': recent_patients,
-        'recent_visits': recent_visits,
-        'total_users': total_users,
-        'users_by_role': users_by_role,
+        **stats,
         'recent_audit': recent_audit,
         'users': users,
     }
@@ -71,19 +57,18 @@ def admin_dashboard(request):
 def patient_list(request):
     q = request.GET.get("q", "").strip()
 
-    # ✅ scope by clinic
-    patients = Patient.objects.for_clinic(request.clinic).order_by("full_name")
-
     if q:
-        q_norm = " ".join(q.lower().split())
-        patients = patients.filter(
-            Q(normalized_name__contains=q_norm)
-            | Q(phone__icontains=q)
-            | Q(national_id__icontains=q)
-        )
+        # ✅ search engine results are scoped by clinic and ranked best match first
+        backend = get_search_backend()
+        patients = backend.search(request.clinic, q)
+        ordering = backend.ordering
+    else:
+        # ✅ scope by clinic
+        patients = Patient.objects.for_clinic(request.clinic)
+        ordering = ("normalized_name", "id")
 
-    paginator = Paginator(patients, 25)
-    page_obj = paginator.get_page(request.GET.get("page"))
+    paginator = KeysetPaginator(patients, 25, ordering=ordering)
+    page_obj = paginator.get_page(request.GET.get("cursor"))
 
     return render(request, "patients/patient_list.html", {"page_obj": page_obj, "q": q})
 
@@ -91,17 +76,6 @@ def patient_list(request):
 @login_required
 @role_required("doctor", "assistant", "admin")
 def patient_create(request):
-    def normalize_phone(s: str) -> str:
-        """Normalize common Egypt phone formats into comparable string."""
-        if not s:
-            return ""
-        s = s.strip().replace(" ", "").replace("-", "")
-        if s.startswith("+20"):
-            s = "0" + s[3:]
-        elif s.startswith("20") and len(s) >= 12:
-            s = "0" + s[2:]
-        return s
-
     if request.method == "POST":
         form = PatientForm(request.POST)
         if form.is_valid():
@@ -110,48 +84,47 @@ def patient_create(request):
             input_phone_raw = form.cleaned_data.get("phone") or ""
             input_phone = normalize_phone(input_phone_raw)
             national_id = (form.cleaned_data.get("national_id") or "").strip()
+            input_national_id = normalize_national_id(national_id)
 
-            matched_ids = []
             match_reasons = {}  # patient_id -> ["national_id", "phone"]
+            duplicates = []
 
-            # ✅ scope duplicate search by clinic
-            if national_id or input_phone:
-                candidates = (
+            # ✅ scope duplicate search by clinic (served by the (clinic, normalized_*) indexes)
+            if input_national_id or input_phone:
+                lookup = Q()
+                if input_national_id:
+                    lookup |= Q(normalized_national_id=input_national_id)
+                if input_phone:
+                    lookup |= Q(normalized_phone=input_phone)
+
+                duplicates = list(
                     Patient.objects
                     .for_clinic(request.clinic)
-                    .only("id", "full_name", "phone", "national_id")
+                    .filter(lookup)
+                    .only("id", "full_name", "phone", "national_id", "normalized_phone", "normalized_national_id")
+                    .order_by("full_name")[:10]
                 )
 
-                for p in candidates:
+                for p in duplicates:
                     reasons = []
 
                     # Strong match: national ID
-                    if national_id and p.national_id and p.national_id.strip().lower() == national_id.lower():
+                    if input_national_id and p.normalized_national_id == input_national_id:
                         reasons.append("national_id")
 
                     # Soft match: phone (normalized)
-                    if input_phone and p.phone:
-                        stored_phone = normalize_phone(p.phone)
-                        if stored_phone and stored_phone == input_phone:
-                            reasons.append("phone")
-
-                    if reasons:
-                        matched_ids.append(p.id)
-                        match_reasons[p.id] = reasons
-
-            duplicates = (
-                Patient.objects.for_clinic(request.clinic).filter(id__in=matched_ids).order_by("full_name")
-                if matched_ids
-                else Patient.objects.none()
-            )
+                    if input_phone and p.normalized_phone == input_phone:
+                        reasons.append("phone")
 
-            if duplicates.exists() and not confirm:
+                    match_reasons[p.id] = reasons
+
+            if duplicates and not confirm:
                 return render(
                     request,
                     "patients/duplicate_warning.html",
                     {
                         "form": form,
-                        "duplicates": duplicates[:10],
+                        "duplicates": duplicates,
                         "match_reasons": match_reasons,
                         "submitted_name": form.cleaned_data.get("full_name"),
                         "submitted_phone": input_phone_raw,
@@ -231,31 +204,35 @@ def patient_edit(request, pk: int):
     return render(request, "patients/patient_form.html", {"form": form, "is_edit": True, "patient": patient})
 
 
+VISITS_PER_PAGE = 20
+
+
 @login_required
 @role_required("doctor", "assistant", "admin")
 def patient_detail(request, pk: int):
     # ✅ patient must belong to the user's clinic
     patient = get_object_or_404(Patient.objects.for_clinic(request.clinic), pk=pk)
 
-    # ✅ scope visits by clinic too
-    visits = Visit.objects.for_clinic(request.clinic).filter(patient=patient).order_by("-visit_datetime")
-
-    # ---- Throttled patient_viewed audit (once per 10 minutes per patient per session) ----
-    VIEW_THROTTLE_SECONDS = 10 * 60  # 10 minutes
-    session_key = f"audit_patient_viewed_ts_{patient.pk}"
-
-    now_ts = time.time()
-    last_ts = request.session.get(session_key)
-    should_log_view = (last_ts is None) or ((now_ts - float(last_ts)) >= VIEW_THROTTLE_SECONDS)
+    # ✅ scope visits by clinic too; large text columns load when a visit is expanded
+    visits = (
+        Visit.objects
+        .for_clinic(request.clinic)
+        .filter(patient=patient)
+        .select_related("doctor")
+        .defer("clinical_notes", "treatment_plan")
+    )
+    visits_page = KeysetPaginator(visits, VISITS_PER_PAGE, ordering=("-visit_datetime", "-id")).get_page(
+        request.GET.get("visits")
+    )
 
-    if should_log_view:
+    # ✅ throttled patient_viewed audit: once per AUDIT_VIEW_THROTTLE_SECONDS per user and patient
+    if should_log(AuditEvent.Action.PATIENT_VIEWED, request.user, patient.pk):
         log_event(
             request,
             action=AuditEvent.Action.PATIENT_VIEWED,
             obj=patient,
             patient_id=patient.pk,
         )
-        request.session[session_key] = now_ts
 
     can_view_audit = request.user.role in ("doctor", "admin")
     audit_events = []
@@ -270,9 +247,17 @@ def patient_detail(request, pk: int):
         )
 
     # ✅ Get attachments for this patient (scoped to clinic)
-    attachments = Attachment.objects.for_clinic(request.clinic).filter(patient=patient).order_by("-uploaded_at")
+    attachments = (
+        Attachment.objects
+        .for_clinic(request.clinic)
+        .filter(patient=patient)
+        .select_related("visit")
+        .defer("visit__clinical_notes", "visit__treatment_plan")
+        .order_by("-uploaded_at")
+    )
 
     can_add_visit = request.user.role in ("doctor", "assistant", "admin")
+    can_edit = request.user.role in ("doctor", "admin")
 
     if request.method == "POST":
         if not can_add_visit:
@@ -313,11 +298,21 @@ def patient_detail(request, pk: int):
         "patients/patient_detail.html",
         {
             "patient": patient,
-            "visits": visits,
+            "visits": visits_page,
             "visit_form": visit_form,
             "can_add_visit": can_add_visit,
             "can_view_audit": can_view_audit,
             "audit_events": audit_events,
             "attachments": attachments,
+            # ✅ the visits, attachments and audit sections are cached per version
+            # and per can_edit, so buttons never leak to roles without them
+            "can_edit": can_edit,
+            # validated position, not the raw ?visits= value, so junk cursors share the first page's entry
+            "visits_cursor": visits_page.cursor,
+            # timeout 0 (the default with a per-process cache) renders the sections every time
+            "fragment_versions": (
+                patient_fragment_versions(patient.pk) if settings.PATIENT_FRAGMENT_CACHE_TIMEOUT else {}
+            ),
+            "fragment_cache_timeout": settings.PATIENT_FRAGMENT_CACHE_TIMEOUT,
         },
     )
\ No newline at end of file
@@ -0,0 +1,117 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from audit.models import AuditEvent
+from clinics.importing import BaseImportCommand, SkipRow
+from patients.models import Patient
+from patients.normalization import normalize_national_ids, normalize_phones
+from visits.models import Visit
+
+
+class Command(BaseImportCommand):
+    help = (
+        "Bulk import visits from CSV / JSON Lines. The patient is matched by patient_id, "
+        "national_id or phone. Other columns: visit_datetime (ISO 8601, required), "
+        "clinical_notes, chief_complaint, diagnosis, treatment_plan, follow_up_date "
+        "(YYYY-MM-DD), doctor (username)."
+    )
+    audit_action = AuditEvent.Action.VISITS_IMPORTED
+    object_name = "visits"
+
+    def prepare(self, clinic):
+        # In-memory lookup of the clinic's patients and doctors (no query per row)
+        self.patient_ids = set()
+        self.by_phone = {}
+        self.by_national_id = {}
+        existing = (
+            Patient.objects.for_clinic(clinic)
+            .values_list("pk", "normalized_phone", "normalized_national_id")
+            .iterator(chunk_size=5000)
+        )
+        for pk, phone, national_id in existing:
+            self.patient_ids.add(pk)
+            if phone:
+                self.by_phone[phone] = pk
+            if national_id:
+                self.by_national_id[national_id] = pk
+
+        self.doctors = dict(
+            get_user_model().objects.filter(clinic=clinic).values_list("username", "pk")
+        )
+
+    def prepare_batch(self, records):
+        # Patient lookup keys of the whole chunk in one pass per column
+        phones = normalize_phones(record.get("phone", "") for record in records)
+        national_ids = normalize_national_ids(record.get("national_id", "") for record in records)
+        for record, phone, national_id in zip(records, phones, national_ids):
+            record["normalized_phone"], record["normalized_national_id"] = phone, national_id
+
+    def find_patient(self, record):
+        if record.get("patient_id"):
+            try:
+                pk = int(record["patient_id"])
+            except ValueError:
+                raise SkipRow(f"invalid patient_id {record['patient_id']!r}")
+            if pk not in self.patient_ids:
+                raise SkipRow(f"no patient {pk} in this clinic")
+            return pk
+        national_id = record["normalized_national_id"]
+        if national_id:
+            if national_id not in self.by_national_id:
+                raise SkipRow(f"no patient with national ID {record['national_id']}")
+            return self.by_national_id[national_id]
+        phone = record["normalized_phone"]
+        if phone:
+            if phone not in self.by_phone:
+                raise SkipRow(f"no patient with phone {record['phone']}")
+            return self.by_phone[phone]
+        raise SkipRow("one of patient_id, national_id or phone is required")
+
+    def build_object(self, record):
+        patient_id = self.find_patient(record)
+
+        try:
+            visit_datetime = parse_datetime(record.get("visit_datetime", ""))
+        except ValueError:
+            visit_datetime = None
+        if visit_datetime is None:
+            raise SkipRow(f"invalid visit_datetime {record.get('visit_datetime', '')!r}")
+        if timezone.is_naive(visit_datetime):
+            visit_datetime = timezone.make_aware(visit_datetime)
+
+        follow_up_date = None
+        if record.get("follow_up_date"):
+            try:
+                follow_up_date = datetime.date.fromisoformat(record["follow_up_date"])
+            except ValueError:
+                raise SkipRow(f"invalid follow_up_date {record['follow_up_date']!r}")
+
+        doctor_id = None
+        if record.get("doctor"):
+            doctor_id = self.doctors.get(record["doctor"])
+            if doctor_id is None:
+                raise SkipRow(f"unknown doctor {record['doctor']!r}")
+
+        for field in ("chief_complaint", "diagnosis"):
+            max_length = Visit._meta.get_field(field).max_length
+            if len(record.get(field, "")) > max_length:
+                raise SkipRow(f"{field} is longer than {max_length} characters")
+
+        # Visit.objects.bulk_create() fills clinic from the patient
+        return Visit(
+            clinic=self.clinic,
+            patient_id=patient_id,
+            doctor_id=doctor_id,
+            visit_datetime=visit_datetime,
+            chief_complaint=record.get("chief_complaint", ""),
+            clinical_notes=record.get("clinical_notes", ""),
+            diagnosis=record.get("diagnosis", ""),
+            treatment_plan=record.get("treatment_plan", ""),
+            follow_up_date=follow_up_date,
+        )
+
+    def insert(self, objs, batch_size):
+        Visit.objects.bulk_create(objs, batch_size=batch_size)
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-17 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0006_patient_search_indexes"),
+        ("visits", "0003_alter_visit_clinic"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="visit",
+            index=models.Index(
+                fields=["patient", "-visit_datetime"],
+                name="visits_visi_patient_5fa8c2_idx",
+            ),
+        ),
+    ]
@@ -1,13 +1,60 @@
+from collections import Counter
+
 from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from clinics.models import Clinic
-from clinics.managers import ClinicManager
+from clinics.caching import bump_patient_fragments
+from clinics.managers import ClinicManager, ClinicQuerySet
+from clinics.stats import adjust_clinic_counters, invalidate_clinic_stats
 from patients.models import Patient
 
 User = settings.AUTH_USER_MODEL
 
 
+class VisitQuerySet(ClinicQuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        bulk_create skips Visit.save(), so enforce visit.clinic == patient.clinic
+        here with a single lookup for all patients that are not already loaded.
+        Raises Patient.DoesNotExist if a visit points at an unknown patient.
+        """
+        objs = list(objs)
+        missing = {
+            obj.patient_id for obj in objs
+            if obj.patient_id and not Visit.patient.is_cached(obj)
+        }
+        clinic_ids = dict(
+            Patient.objects.filter(pk__in=missing).values_list("pk", "clinic_id")
+        ) if missing else {}
+
+        for obj in objs:
+            if not obj.patient_id:
+                continue
+            if Visit.patient.is_cached(obj):
+                obj.clinic_id = obj.patient.clinic_id
+            elif obj.patient_id in clinic_ids:
+                obj.clinic_id = clinic_ids[obj.patient_id]
+            else:
+                raise Patient.DoesNotExist(f"Patient {obj.patient_id} does not exist.")
+
+        created = super().bulk_create(objs, *args, **kwargs)
+
+        # post_save is not sent either, so keep the clinic usage counters and the
+        # cached patient page fragments in step
+        if not kwargs.get("ignore_conflicts") and not kwargs.get("update_conflicts"):
+            for clinic_id, count in Counter(obj.clinic_id for obj in created).items():
+                adjust_clinic_counters(clinic_id, visit_count=count)
+                invalidate_clinic_stats(clinic_id)
+        bump_patient_fragments((obj.patient_id for obj in created), "visits", "attachments")
+        return created
+
+
+class VisitManager(ClinicManager):
+    def get_queryset(self):
+        return VisitQuerySet(self.model, using=self._db)
+
+
 class Visit(models.Model):
     clinic = models.ForeignKey(
         Clinic,
@@ -41,13 +88,26 @@ class Visit(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    objects = ClinicManager()
+    objects = VisitManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the pair as loaded so save() can skip re-checking it
+        instance._loaded_patient_clinic = (instance.__dict__.get("patient_id"), instance.__dict__.get("clinic_id"))
+        return instance
 
     def save(self, *args, **kwargs):
-        # keep visit.clinic consistent with patient.clinic
+        # keep visit.clinic consistent with patient.clinic, comparing ids only
         if self.patient_id:
-            self.clinic = self.patient.clinic
+            if Visit.patient.is_cached(self):
+                self.clinic_id = self.patient.clinic_id
+            elif getattr(self, "_loaded_patient_clinic", None) != (self.patient_id, self.clinic_id):
+                self.clinic_id = (
+                    Patient.objects.filter(pk=self.patient_id).values_list("clinic_id", flat=True).get()
+                )
         super().save(*args, **kwargs)
+        self._loaded_patient_clinic = (self.patient_id, self.clinic_id)
 
     def __str__(self):
         return f"Visit {self.id} - {self.patient.full_name}"
@@ -57,4 +117,5 @@ class Visit(models.Model):
         indexes = [
             models.Index(fields=["visit_datetime"]),
             models.Index(fields=["clinic", "visit_datetime"]),
+            models.Index(fields=["patient", "-visit_datetime"]),
         ]
\ No newline at end of file
@@ -5,4 +5,5 @@ app_name = "visits"
 
 urlpatterns = [
     path("<int:pk>/edit/", views.visit_edit, name="edit"),
+    path("<int:pk>/notes/", views.visit_notes, name="notes"),
 ]
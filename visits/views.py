@@ -13,7 +13,7 @@ from .models import Visit
 @role_required("doctor", "admin")
 def visit_edit(request, pk: int):
     # ✅ BLOCK cross-clinic access immediately
-    visit = get_object_or_404(Visit.objects.for_clinic(request.clinic), pk=pk)
+    visit = get_object_or_404(Visit.objects.for_clinic(request.clinic).select_related("patient"), pk=pk)
 
     if request.method == "POST":
         form = VisitForm(request.POST, instance=visit)
@@ -30,8 +30,22 @@ def visit_edit(request, pk: int):
             )
 
             messages.success(request, "Visit saved successfully.")
-            return redirect("patients:detail", pk=visit.patient.pk)
+            return redirect("patients:detail", pk=visit.patient_id)
     else:
         form = VisitForm(instance=visit)
 
-    return render(request, "visits/visit_edit.html", {"form": form, "visit": visit})
\ No newline at end of file
+    return render(request, "visits/visit_edit.html", {"form": form, "visit": visit})
+
+
+@login_required
+@role_required("doctor", "assistant", "admin")
+def visit_notes(request, pk: int):
+    """
+    Clinical notes and treatment plan of one visit, loaded when the visit is
+    expanded in the patient_detail timeline.
+    """
+    visit = get_object_or_404(
+        Visit.objects.for_clinic(request.clinic).only("id", "clinic_id", "clinical_notes", "treatment_plan"),
+        pk=pk,
+    )
+    return render(request, "visits/visit_notes.html", {"visit": visit})